@@ -0,0 +1,974 @@
+#!/usr/bin/env python3
+"""
+Benchmark the BibTeX to HTML pipeline
+"""
+
+import argparse
+import contextlib
+import html
+import io
+import json
+import random
+import re
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import pybtex
+from pybtex.database import BibliographyData
+
+from scripts.bibtex_to_html import (
+    _ASTERISK_PLACEHOLDER,
+    _DEFAULT_HIGHLIGHT_NAMES,
+    _citation_rewriter,
+    _iter_rendered_entries,
+    _merge_sources,
+    _name_cache,
+    _parse_and_sort_bibtex,
+    _parse_keyed_entries,
+    _render_citation_text,
+    _render_entries,
+    _select_first_author_entries,
+    write_target,
+    write_target_stream,
+)
+from scripts.check_links import _percentile, check_links, link_ok
+
+_LAST_NAMES = [
+    "Bonn",
+    "Fernández-Zapata",
+    "Huber",
+    "Kaiser",
+    "Krebs",
+    "Panzer",
+    "Puelles",
+    "Schaub",
+    "Wang",
+    "Yousefi",
+]
+_JOURNALS = [
+    "Bioinformatics",
+    "Nature Communications",
+    "Nucleic Acids Research",
+    "Science Translational Medicine",
+]
+_MONTHS = ["January", "March", "June", "October"]
+
+# Synthetic bibliography building blocks
+_HIGHLIGHTED_AUTHOR = "Schaub, Darius P."
+_FIRST_NAMES = [
+    "Anna",
+    "Christian F.",
+    "Hans-Joachim",
+    "Jonas",
+    "Lukas",
+    "Madalena",
+    "Nora C.",
+    "Stefan",
+    "Ulf",
+    "Victor G.",
+    "Yu",
+    "Zeba",
+]
+_SYLLABLES = ["ba", "ch", "de", "el", "fr", "gor", "hu", "ka", "lin", "mo", "ner", "os"]
+_ACCENTED_LAST_NAMES = [
+    "{Fern{\\'a}ndez-Zapata}",
+    'Mittr{\\"u}cker',
+    "{Saez-Rodriguez}",
+    "{Jauch-Speer}",
+]
+_TITLE_WORDS = [
+    "analysis",
+    "atlas",
+    "cells",
+    "deep",
+    "glomerulonephritis",
+    "immune",
+    "kidney",
+    "learning",
+    "models",
+    "single-cell",
+    "spatial",
+    "transcriptomics",
+]
+_MONTH_MACROS = [
+    "jan",
+    "feb",
+    "mar",
+    "apr",
+    "may",
+    "jun",
+    "jul",
+    "aug",
+    "sep",
+    "oct",
+    "nov",
+    "dec",
+]
+_MONTH_FORMATS = [
+    lambda month: _MONTH_MACROS[month - 1],
+    lambda month: "{" + _MONTH_MACROS[month - 1].capitalize() + "}",
+    lambda month: "{" + str(month) + "}",
+    lambda month: str(month),
+]
+
+_PIPELINE_SCENARIOS = ("parse", "select", "card", "citation")
+
+# Slowdowns below this many seconds are treated as noise, whatever the tolerance
+_REGRESSION_FLOOR = 0.005
+
+_DEFAULT_BASELINE = (
+    Path(__file__).resolve().parent.parent / ".benchmarks" / "pipeline-baseline.json"
+)
+
+# "import time: <self us> | <cumulative us> | <indented module name>"
+_IMPORTTIME_PATTERN = re.compile(r"import time:\s+\d+ \|\s+(\d+) \| (.*)$")
+
+
+def _legacy_render_citation_text(citation_str):
+    """Reference implementation: the sequential regex/placeholder chain used before the single-pass rewriter"""
+    citation_str = re.sub(r"\((\d{4})\s*,\s*[A-Za-z]+\s*\)", r"(\1)", citation_str)
+
+    title_pattern = (
+        r"(\((\d{4})\)\.\s+)(.+?\.)(?=\s+[A-Z][a-zA-Z\s&,]+(?:,|\.)|\s*[^A-Z]|$)"
+    )
+    citation_str = re.sub(
+        title_pattern,
+        lambda m: f"{m.group(1)}__TITLE_START__{m.group(3)}__TITLE_END__",
+        citation_str,
+    )
+
+    doi_replacements = []
+
+    def replace_doi_placeholder(match):
+        placeholder = f"__DOI_PLACEHOLDER_{len(doi_replacements)}__"
+        doi_replacements.append(match.group(1))
+        return placeholder
+
+    citation_str = re.sub(
+        r'doi:([0-9]+\.[0-9]+/[^\s<>"\'&]+)', replace_doi_placeholder, citation_str
+    )
+    citation_str = re.sub(r"(Schaub, D\.\s*P\.)", r"__SCH_AUB_D_P__", citation_str)
+    citation_str = re.sub(r"(Schaub, D\.)(?!\s*P\.)", r"__SCH_AUB_D__", citation_str)
+
+    citation_html = html.escape(citation_str)
+    citation_html = citation_html.replace(
+        html.escape(_ASTERISK_PLACEHOLDER), "<sup>*</sup>"
+    )
+    citation_html = re.sub(
+        r"__SCH_AUB_D_P__(<sup>\*</sup>)?",
+        r"<strong>Schaub, D. P.\1</strong>",
+        citation_html,
+    )
+    citation_html = re.sub(
+        r"__SCH_AUB_D__(<sup>\*</sup>)?",
+        r"<strong>Schaub, D.\1</strong>",
+        citation_html,
+    )
+    citation_html = re.sub(
+        r"__TITLE_START__([^_]+)__TITLE_END__", r"<strong>\1</strong>", citation_html
+    )
+    for i, doi_value in enumerate(doi_replacements):
+        doi_url = f"https://doi.org/{doi_value}"
+        link_html = f'<a href="{html.escape(doi_url)}" target="_blank" rel="noopener noreferrer">doi:{html.escape(doi_value)}</a>'
+        citation_html = citation_html.replace(
+            html.escape(f"__DOI_PLACEHOLDER_{i}__"), link_html
+        )
+    return citation_html
+
+
+def _synthetic_citation(rng, author_count, doi_count):
+    """Build a plain-text APA citation as produced by pybtex, with shared-author markers"""
+    authors = []
+    for i in range(author_count):
+        last = rng.choice(_LAST_NAMES)
+        initials = "D. P." if last == "Schaub" else rng.choice(["A.", "B. C.", "J.-H."])
+        star = _ASTERISK_PLACEHOLDER if i < rng.randint(0, 3) else ""
+        authors.append(f"{last}, {initials}{star}")
+    author_str = ", ".join(authors[:-1]) + ", & " + authors[-1]
+
+    year = rng.randint(2000, 2026)
+    date = f"({year}, {rng.choice(_MONTHS)})" if rng.random() < 0.7 else f"({year})"
+    title = "Spatial & temporal omics <analysis> of kidney disease"
+    journal = rng.choice(_JOURNALS)
+    dois = " ".join(
+        f"doi:10.{1000 + i}/s{rng.randint(10000, 99999)}" for i in range(doi_count)
+    )
+    return f"{author_str} {date}. {title}. {journal}, 41(1), 1–12. {dois}"
+
+
+def bench_citation(count, author_count, doi_count, repeat, seed):
+    """Compare the single-pass citation rewriter against the legacy regex chain"""
+    rng = random.Random(seed)
+    citations = [
+        _synthetic_citation(rng, author_count, doi_count) for _ in range(count)
+    ]
+
+    for citation in citations:
+        expected = _legacy_render_citation_text(citation)
+        actual = _render_citation_text(citation)
+        if actual != expected:
+            print("Output mismatch for citation:", citation, file=sys.stderr)
+            print(f"  legacy: {expected}\n  single: {actual}", file=sys.stderr)
+            sys.exit(1)
+
+    results = {}
+    for name, render in (
+        ("legacy", _legacy_render_citation_text),
+        ("single-pass", _render_citation_text),
+    ):
+        best = float("inf")
+        for _ in range(repeat):
+            start = time.perf_counter()
+            for citation in citations:
+                render(citation)
+            best = min(best, time.perf_counter() - start)
+        results[name] = best
+        print(f"{name:>12}: {count / best:12.0f} citations/s ({best * 1000:.1f} ms)")
+
+    print(f"{'speedup':>12}: {results['legacy'] / results['single-pass']:.2f}x")
+
+
+def _synthetic_highlight_names(rng, count):
+    """Default highlighted names plus made-up formatted names, count in total"""
+    names = set(_DEFAULT_HIGHLIGHT_NAMES)
+    while len(names) < count:
+        last = "".join(rng.choice(_SYLLABLES) for _ in range(rng.randint(2, 4)))
+        initials = " ".join(f"{rng.choice('ABCDEFGHJKLMNPRSTUVW')}." for _ in range(2))
+        names.add(f"{last.capitalize()}, {initials}")
+    return tuple(sorted(names))
+
+
+def bench_highlight(count, name_counts, repeat, seed):
+    """Measure citation rewriting throughput as the list of highlighted names grows"""
+    rng = random.Random(seed)
+    citations = [_synthetic_citation(rng, 12, 1) for _ in range(count)]
+
+    baseline = None
+    for name_count in name_counts:
+        render = _citation_rewriter(_synthetic_highlight_names(rng, name_count))
+        best = float("inf")
+        for _ in range(repeat):
+            start = time.perf_counter()
+            for citation in citations:
+                render(citation)
+            best = min(best, time.perf_counter() - start)
+        baseline = baseline or best
+        print(
+            f"{name_count:>5} names: {count / best:12.0f} citations/s "
+            f"({best * 1000:.1f} ms, {best / baseline:.2f}x)"
+        )
+
+
+def _synthetic_author_pool(rng, size):
+    """Build distinct "Last, First" names, including braced and accented surnames"""
+    pool = set()
+    while len(pool) < size:
+        if rng.random() < 0.02:
+            last = rng.choice(_ACCENTED_LAST_NAMES)
+        else:
+            syllables = rng.randint(2, 4)
+            last = "".join(
+                rng.choice(_SYLLABLES) for _ in range(syllables)
+            ).capitalize()
+        pool.add(f"{last}, {rng.choice(_FIRST_NAMES)}")
+    pool.discard(_HIGHLIGHTED_AUTHOR)
+    return sorted(pool)
+
+
+def _synthetic_entry(rng, index, author_pool):
+    """Build one @article entry with a realistic mix of authors, months and links"""
+    # Mostly small author lists, with a long tail of consortium papers (>20 authors)
+    if rng.random() < 0.15:
+        author_count = rng.randint(21, 60)
+    else:
+        author_count = rng.randint(1, 20)
+    authors = rng.sample(author_pool, author_count)
+
+    placement = rng.random()
+    if placement < 0.15:
+        authors.insert(0, _HIGHLIGHTED_AUTHOR)
+    elif placement < 0.6:
+        authors.insert(rng.randint(1, len(authors)), _HIGHLIGHTED_AUTHOR)
+
+    title_words = rng.sample(_TITLE_WORDS, rng.randint(4, 9))
+    title_words[0] = title_words[0].capitalize()
+    if rng.random() < 0.3:
+        title_words[-1] = "{{" + title_words[-1].upper() + "}}"
+    title = " ".join(title_words)
+
+    year = rng.randint(1990, 2026)
+    fields = [
+        f"  title = {{{title}}}",
+        f"  author = {{{' and '.join(authors)}}}",
+        f"  year = {year}",
+    ]
+    if rng.random() < 0.85:
+        month = rng.randint(1, 12)
+        fields.append(f"  month = {rng.choice(_MONTH_FORMATS)(month)}")
+    fields.append(f"  journal = {{{rng.choice(_JOURNALS)}}}")
+    fields.append(f"  volume = {{{rng.randint(1, 60)}}}")
+    fields.append(f"  pages = {{{rng.randint(1, 9000)}}}")
+
+    link = rng.random()
+    if link < 0.6:
+        fields.append(f"  doi = {{10.{rng.randint(1000, 9999)}/syn.{index}}}")
+    elif link < 0.85:
+        fields.append(f"  url = {{https://example.org/papers/{index}}}")
+
+    if rng.random() < 0.1:
+        fields.append(f"  usera = {{{rng.randint(2, 3)}}}")
+
+    return f"@article{{synthetic{index:06d},\n" + ",\n".join(fields) + "\n}\n"
+
+
+def generate_bibliography(count, seed=0):
+    """Generate a synthetic BibTeX bibliography with count entries"""
+    rng = random.Random(seed)
+    author_pool = _synthetic_author_pool(rng, max(200, count // 2))
+    return "\n".join(
+        _synthetic_entry(rng, index, author_pool) for index in range(count)
+    )
+
+
+def _time_pipeline(bibtex_path):
+    """Time parsing, the selected-only filter and both render modes on a cold name cache"""
+    timings = {}
+
+    start = time.perf_counter()
+    sorted_entries, style, backend = _parse_and_sort_bibtex(bibtex_path)
+    timings["parse"] = time.perf_counter() - start
+
+    _name_cache.clear()
+    start = time.perf_counter()
+    _select_first_author_entries(sorted_entries, style, backend)
+    timings["select"] = time.perf_counter() - start
+
+    bib_data = BibliographyData(dict(sorted_entries))
+    for mode in ("card", "citation"):
+        _name_cache.clear()
+        start = time.perf_counter()
+        _render_entries(sorted_entries, mode, style, backend, bib_data)
+        timings[mode] = time.perf_counter() - start
+
+    return timings
+
+
+def _load_baseline(baseline_path):
+    """Load stored pipeline timings, or None if there is no baseline yet"""
+    try:
+        with open(baseline_path, encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+
+def _save_baseline(baseline_path, baseline, results, seed):
+    """Merge results into the stored baseline"""
+    baseline = baseline or {"results": {}}
+    baseline["python"] = sys.version.split()[0]
+    baseline["pybtex"] = pybtex.__version__
+    baseline["seed"] = seed
+    baseline["results"].update(results)
+
+    baseline_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(baseline_path, "w", encoding="utf-8") as f:
+        json.dump(baseline, f, indent=2, sort_keys=True)
+        f.write("\n")
+
+
+def bench_pipeline(sizes, repeat, seed, baseline_path, save_baseline, tolerance):
+    """Time the pipeline on synthetic bibliographies and compare against a stored baseline"""
+    baseline = _load_baseline(baseline_path)
+    if baseline is not None and baseline.get("seed") != seed:
+        if not save_baseline:
+            print(
+                f"Baseline {baseline_path} was recorded with seed {baseline.get('seed')}, "
+                f"not {seed}; rerun with --save-baseline",
+                file=sys.stderr,
+            )
+            sys.exit(1)
+        baseline = None
+    baseline_results = baseline["results"] if baseline else {}
+
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for size in sizes:
+            bibtex_path = Path(tmp) / f"synthetic-{size}.bib"
+            bibtex_path.write_text(generate_bibliography(size, seed), encoding="utf-8")
+            for _ in range(repeat):
+                for scenario, seconds in _time_pipeline(bibtex_path).items():
+                    name = f"{scenario}@{size}"
+                    results[name] = min(results.get(name, float("inf")), seconds)
+
+    print(
+        f"{'Entries':>8}  {'Scenario':<10}{'Time (ms)':>12}{'us/entry':>10}"
+        f"{'Baseline':>12}{'Change':>9}"
+    )
+    regressions = []
+    for size in sizes:
+        for scenario in _PIPELINE_SCENARIOS:
+            name = f"{scenario}@{size}"
+            seconds = results[name]
+            line = (
+                f"{size:>8}  {scenario:<10}{seconds * 1000:>12.1f}"
+                f"{seconds / size * 1e6:>10.1f}"
+            )
+            reference = baseline_results.get(name)
+            if reference:
+                change = seconds / reference - 1
+                line += f"{reference * 1000:>12.1f}{change:>+9.0%}"
+                if change > tolerance and seconds - reference > _REGRESSION_FLOOR:
+                    regressions.append((name, seconds, reference, change))
+                    line += "  REGRESSION"
+            print(line)
+
+    if save_baseline:
+        _save_baseline(baseline_path, baseline, results, seed)
+        print(f"Saved baseline to {baseline_path}")
+    elif baseline is None:
+        # Without a baseline nothing was checked, which must not pass as a clean run
+        print(
+            f"Error: no baseline at {baseline_path}; run with --save-baseline to record one",
+            file=sys.stderr,
+        )
+        sys.exit(1)
+
+    if regressions and not save_baseline:
+        for name, seconds, reference, change in regressions:
+            print(
+                f"REGRESSION: {name} took {seconds * 1000:.1f} ms vs baseline "
+                f"{reference * 1000:.1f} ms ({change:+.0%}, tolerance {tolerance:.0%})",
+                file=sys.stderr,
+            )
+        sys.exit(1)
+
+
+# Titles differing in one letter or digit, which must all survive a merge
+_DISTINCT_TITLES = (
+    "Spatial Atlas of the Kidney, Part 1",
+    "Spatial Atlas of the Kidney, Part 2",
+    "T cell responses in glomerulonephritis",
+    "B cell responses in glomerulonephritis",
+    "A Phase I trial",
+    "A Phase V trial",
+)
+
+
+def _check_merge_keeps_distinct():
+    """Exit with an error if the duplicate index merges entries with distinct titles"""
+    from pybtex.database import Entry, Person
+
+    keyed_entries = []
+    for index, title in enumerate(_DISTINCT_TITLES):
+        entry = Entry(
+            "article", fields={"title": title, "year": "2024", "doi": f"10.1/{index}"}
+        )
+        entry.persons["author"] = [Person("Schaub, Darius P.")]
+        keyed_entries.append(((2024, 0), f"distinct{index}", entry))
+    # The same titles without DOIs from a second source are duplicates
+    copies = []
+    for (sort_key, key, entry), title in zip(keyed_entries, _DISTINCT_TITLES):
+        copy = Entry("article", fields={"title": title.upper(), "year": "2024"})
+        copy.persons["author"] = entry.persons["author"]
+        copies.append((sort_key, f"{key}-copy", copy))
+
+    merged, duplicates = _merge_sources([keyed_entries, copies])
+    if len(merged) != len(_DISTINCT_TITLES) or duplicates != len(copies):
+        print(
+            f"Error: merging {len(_DISTINCT_TITLES)} distinct titles and their copies "
+            f"kept {len(merged)} entries and dropped {duplicates}",
+            file=sys.stderr,
+        )
+        sys.exit(1)
+
+
+def bench_merge(sizes, source_count, overlap, repeat, seed):
+    """Time merging overlapping bibliographies through the duplicate index"""
+    _check_merge_keeps_distinct()
+    rng = random.Random(seed)
+    print(
+        f"{'Entries':>8}{'Sources':>9}{'Input':>9}{'Kept':>8}{'Duplicates':>12}"
+        f"{'Time (ms)':>12}{'us/entry':>10}"
+    )
+    with tempfile.TemporaryDirectory() as tmp:
+        for size in sizes:
+            bibtex_path = Path(tmp) / f"synthetic-{size}.bib"
+            bibtex_path.write_text(generate_bibliography(size, seed), encoding="utf-8")
+            keyed_entries = _parse_keyed_entries(bibtex_path)
+
+            # Further sources hold a random share of the entries under their own
+            # citation keys, like exports from other group members
+            sources = [keyed_entries]
+            for index in range(1, source_count):
+                sources.append(
+                    [
+                        (sort_key, f"{key}-{index}", entry)
+                        for sort_key, key, entry in keyed_entries
+                        if rng.random() < overlap
+                    ]
+                )
+            total = sum(map(len, sources))
+
+            best = float("inf")
+            for _ in range(repeat):
+                start = time.perf_counter()
+                merged, duplicates = _merge_sources(sources)
+                best = min(best, time.perf_counter() - start)
+            print(
+                f"{size:>8}{source_count:>9}{total:>9}{len(merged):>8}{duplicates:>12}"
+                f"{best * 1000:>12.1f}{best / total * 1e6:>10.2f}"
+            )
+
+
+class _StandInLinkHandler(BaseHTTPRequestHandler):
+    """
+    Local stand-in for publisher sites, answering after a fixed delay.
+
+    /ok/N answers 200, /redirect/N redirects to /ok/N, /nohead/N rejects HEAD
+    with 405 but answers GET, and /missing/N answers 404.
+    """
+
+    protocol_version = "HTTP/1.1"
+    # Headers and body are written separately; without this, Nagle's algorithm
+    # and delayed ACKs add 40 ms to GET responses
+    disable_nagle_algorithm = True
+    delay = 0.0
+
+    def _respond(self, head_only):
+        time.sleep(self.delay)
+        kind = self.path.split("/")[1]
+        if kind == "redirect":
+            status, location = 301, self.path.replace("/redirect/", "/ok/", 1)
+        elif kind == "missing" or (kind == "nohead" and head_only):
+            status, location = 404 if kind == "missing" else 405, None
+        else:
+            status, location = 200, None
+        body = b"" if head_only else b"stand-in\n"
+        self.send_response(status)
+        if location:
+            self.send_header("Location", location)
+        self.send_header("Content-Length", str(len(b"stand-in\n")))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_HEAD(self):
+        self._respond(head_only=True)
+
+    def do_GET(self):
+        self._respond(head_only=False)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class _StandInServer(ThreadingHTTPServer):
+    """Threaded stand-in server whose listen backlog holds a burst of connections"""
+
+    # The default of 5 drops SYNs when the checker opens many connections at
+    # once, adding a one-second retransmit to their latency
+    request_queue_size = 128
+    daemon_threads = True
+
+
+def _stand_in_urls(ports, count, seed):
+    """URLs spread over the stand-in hosts: 70% ok, 10% each redirect, no HEAD, missing"""
+    rng = random.Random(seed)
+    kinds = ["ok"] * 7 + ["redirect", "nohead", "missing"]
+    return [
+        f"http://127.0.0.1:{rng.choice(ports)}/{rng.choice(kinds)}/{index}"
+        for index in range(count)
+    ]
+
+
+def bench_links(count, host_count, delay, concurrency, per_host, seed):
+    """Check links against local stand-in servers, one by one and concurrently"""
+    handler = type("Handler", (_StandInLinkHandler,), {"delay": delay})
+    servers = []
+    for _ in range(host_count):
+        server = _StandInServer(("127.0.0.1", 0), handler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        servers.append(server)
+
+    try:
+        urls = _stand_in_urls(
+            [server.server_address[1] for server in servers], count, seed
+        )
+        expected_failures = sum("/missing/" in url for url in urls)
+        print(
+            f"{count} links on {host_count} stand-in hosts answering after "
+            f"{delay * 1000:.0f} ms"
+        )
+        print(
+            f"{'Run':<12}{'Links/sec':>11}{'p50 (ms)':>10}{'p99 (ms)':>10}"
+            f"{'Requests':>10}{'Connections':>13}{'Failed':>8}"
+        )
+        for name, run_concurrency, run_per_host in (
+            ("sequential", 1, 1),
+            ("concurrent", concurrency, per_host),
+        ):
+            start = time.perf_counter()
+            results, stats = check_links(urls, run_concurrency, run_per_host)
+            elapsed = time.perf_counter() - start
+            latencies = sorted(stats["latencies"])
+            failures = sum(not link_ok(result) for result in results.values())
+            print(
+                f"{name:<12}{count / elapsed:>11.1f}"
+                f"{_percentile(latencies, 0.5) * 1000:>10.1f}"
+                f"{_percentile(latencies, 0.99) * 1000:>10.1f}"
+                f"{stats['HEAD'] + stats['GET']:>10}{stats['connections']:>13}"
+                f"{failures:>8}"
+            )
+            if failures != expected_failures:
+                print(
+                    f"Error: expected {expected_failures} failed links, got {failures}",
+                    file=sys.stderr,
+                )
+                sys.exit(1)
+    finally:
+        for server in servers:
+            server.shutdown()
+            server.server_close()
+
+
+def _peak_memory(write):
+    """Peak traced memory in bytes while write() runs, with its output silenced"""
+    tracemalloc.start()
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            write()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def bench_memory(sizes, seed):
+    """Compare peak memory of rendering into a page via one joined string and by streaming"""
+    project_root = Path(__file__).parent.parent
+    page = (project_root / "index.html").read_text(encoding="utf-8")
+
+    print(f"{'Entries':>8}{'Joined (MB)':>14}{'Streamed (MB)':>16}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for size in sizes:
+            bibtex_path = Path(tmp) / f"synthetic-{size}.bib"
+            bibtex_path.write_text(generate_bibliography(size, seed), encoding="utf-8")
+            # Parsing is shared by both paths and not measured
+            sorted_entries, style, backend = _parse_and_sort_bibtex(bibtex_path)
+            bib_data = BibliographyData(dict(sorted_entries))
+            html_path = Path(tmp) / "index.html"
+
+            def render():
+                return _iter_rendered_entries(
+                    sorted_entries, "card", style, backend, bib_data
+                )
+
+            html_path.write_text(page, encoding="utf-8")
+            joined = _peak_memory(
+                lambda: write_target(html_path, "\n".join(list(render())))
+            )
+            html_path.write_text(page, encoding="utf-8")
+            streamed = _peak_memory(lambda: write_target_stream(html_path, render()))
+            print(f"{size:>8}{joined / 1e6:>14.1f}{streamed / 1e6:>16.1f}")
+
+
+def _parse_importtime(stderr):
+    """Top-level (module, cumulative seconds) pairs from python -X importtime output"""
+    imports = []
+    for line in stderr.splitlines():
+        match = _IMPORTTIME_PATTERN.match(line)
+        # Nested imports are indented below the module that triggered them
+        if match and not match.group(2).startswith(" "):
+            imports.append((match.group(2), int(match.group(1)) / 1e6))
+    return imports
+
+
+def bench_startup(repeat, top):
+    """Time bibtex-to-html process startup, with imports broken down by python -X importtime"""
+    project_root = Path(__file__).parent.parent
+    with tempfile.TemporaryDirectory() as tmp:
+        output = str(Path(tmp) / "publications.html")
+        scenarios = {
+            "help": ["--help"],
+            "build": ["--target", f"card:all={output}"],
+            "no-cache": ["--target", f"card:all={output}", "--no-cache"],
+        }
+
+        results = {}
+        for scenario, args in scenarios.items():
+            command = [
+                sys.executable,
+                "-X",
+                "importtime",
+                "-m",
+                "scripts.bibtex_to_html",
+            ]
+            walls = []
+            import_totals = []
+            # The first run is not timed, so "build" starts from warm caches
+            for run in range(repeat + 1):
+                start = time.perf_counter()
+                completed = subprocess.run(
+                    command + args, cwd=project_root, capture_output=True, text=True
+                )
+                wall = time.perf_counter() - start
+                if completed.returncode != 0:
+                    print(completed.stderr, file=sys.stderr)
+                    sys.exit(completed.returncode)
+                imports = _parse_importtime(completed.stderr)
+                if run > 0:
+                    walls.append(wall)
+                    import_totals.append(sum(seconds for _, seconds in imports))
+            results[scenario] = (
+                statistics.median(walls),
+                statistics.median(import_totals),
+                imports,
+            )
+
+    print(f"{'Scenario':<10}{'Wall (ms)':>12}{'Imports (ms)':>14}{'Modules':>9}")
+    for scenario, (wall, import_total, imports) in results.items():
+        print(
+            f"{scenario:<10}{wall * 1000:>12.1f}{import_total * 1000:>14.1f}"
+            f"{len(imports):>9}"
+        )
+    for scenario, (_, _, imports) in results.items():
+        print(f"\nSlowest top-level imports ({scenario}):")
+        for module, seconds in sorted(imports, key=lambda item: -item[1])[:top]:
+            print(f"  {seconds * 1000:8.1f} ms  {module}")
+
+
+def _parse_sizes(value):
+    """Parse a comma-separated list of sizes"""
+    try:
+        sizes = [int(size) for size in value.split(",") if size.strip()]
+    except ValueError:
+        raise argparse.ArgumentTypeError(
+            f"invalid sizes {value!r}, expected e.g. 100,1000"
+        ) from None
+    if not sizes or min(sizes) < 1:
+        raise argparse.ArgumentTypeError("sizes must be positive")
+    return sizes
+
+
+def main():
+    """Main function"""
+    parser = argparse.ArgumentParser(description="Benchmark the BibTeX pipeline")
+    subparsers = parser.add_subparsers(dest="benchmark", required=True)
+
+    citation_parser = subparsers.add_parser(
+        "citation",
+        help="Compare citation post-processing throughput (single-pass vs legacy)",
+    )
+    citation_parser.add_argument(
+        "--count", type=int, default=2000, help="Number of citations (default: 2000)"
+    )
+    citation_parser.add_argument(
+        "--authors", type=int, default=12, help="Authors per citation (default: 12)"
+    )
+    citation_parser.add_argument(
+        "--dois", type=int, default=1, help="DOIs per citation (default: 1)"
+    )
+    citation_parser.add_argument(
+        "--repeat", type=int, default=5, help="Timed repetitions (default: 5)"
+    )
+    citation_parser.add_argument(
+        "--seed", type=int, default=0, help="Random seed (default: 0)"
+    )
+
+    highlight_parser = subparsers.add_parser(
+        "highlight",
+        help="Measure citation rewriting throughput as the highlighted author list grows",
+    )
+    highlight_parser.add_argument(
+        "--count", type=int, default=2000, help="Number of citations (default: 2000)"
+    )
+    highlight_parser.add_argument(
+        "--names",
+        type=_parse_sizes,
+        default=[2, 10, 50, 100],
+        help="Comma-separated highlight list sizes (default: 2,10,50,100)",
+    )
+    highlight_parser.add_argument(
+        "--repeat", type=int, default=5, help="Timed repetitions (default: 5)"
+    )
+    highlight_parser.add_argument(
+        "--seed", type=int, default=0, help="Random seed (default: 0)"
+    )
+
+    pipeline_parser = subparsers.add_parser(
+        "pipeline",
+        help="Time parsing, selected-only filtering and both render modes on synthetic bibliographies",
+    )
+    pipeline_parser.add_argument(
+        "--entries",
+        type=_parse_sizes,
+        default=[100, 1000],
+        help="Comma-separated bibliography sizes, e.g. 100,1000,100000 (default: 100,1000)",
+    )
+    pipeline_parser.add_argument(
+        "--repeat", type=int, default=3, help="Timed repetitions (default: 3)"
+    )
+    pipeline_parser.add_argument(
+        "--seed", type=int, default=0, help="Random seed (default: 0)"
+    )
+    pipeline_parser.add_argument(
+        "--baseline",
+        type=Path,
+        default=_DEFAULT_BASELINE,
+        help="Baseline timings file (default: .benchmarks/pipeline-baseline.json)",
+    )
+    pipeline_parser.add_argument(
+        "--save-baseline",
+        action="store_true",
+        help="Record these timings as the new baseline instead of failing on regressions",
+    )
+    pipeline_parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.25,
+        help="Allowed slowdown relative to the baseline (default: 0.25)",
+    )
+
+    startup_parser = subparsers.add_parser(
+        "startup",
+        help="Time bibtex-to-html startup for --help and builds, with an import breakdown",
+    )
+    startup_parser.add_argument(
+        "--repeat", type=int, default=5, help="Timed runs per scenario (default: 5)"
+    )
+    startup_parser.add_argument(
+        "--top",
+        type=int,
+        default=8,
+        help="Slowest top-level imports listed per scenario (default: 8)",
+    )
+
+    merge_parser = subparsers.add_parser(
+        "merge",
+        help="Time removing duplicates from overlapping bibliographies",
+    )
+    merge_parser.add_argument(
+        "--entries",
+        type=_parse_sizes,
+        default=[1000, 5000],
+        help="Comma-separated bibliography sizes (default: 1000,5000)",
+    )
+    merge_parser.add_argument(
+        "--sources", type=int, default=4, help="Number of sources (default: 4)"
+    )
+    merge_parser.add_argument(
+        "--overlap",
+        type=float,
+        default=0.7,
+        help="Share of the entries repeated in each further source (default: 0.7)",
+    )
+    merge_parser.add_argument(
+        "--repeat", type=int, default=3, help="Timed repetitions (default: 3)"
+    )
+    merge_parser.add_argument(
+        "--seed", type=int, default=0, help="Random seed (default: 0)"
+    )
+
+    links_parser = subparsers.add_parser(
+        "links",
+        help="Time the link checker against local stand-in servers",
+    )
+    links_parser.add_argument(
+        "--count", type=int, default=200, help="Number of links (default: 200)"
+    )
+    links_parser.add_argument(
+        "--hosts", type=int, default=4, help="Number of stand-in hosts (default: 4)"
+    )
+    links_parser.add_argument(
+        "--delay",
+        type=float,
+        default=0.02,
+        help="Seconds each stand-in response takes (default: 0.02)",
+    )
+    links_parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=32,
+        help="Requests in flight in the concurrent run (default: 32)",
+    )
+    links_parser.add_argument(
+        "--per-host",
+        type=int,
+        default=8,
+        help="Requests in flight per host in the concurrent run (default: 8)",
+    )
+    links_parser.add_argument(
+        "--seed", type=int, default=0, help="Random seed (default: 0)"
+    )
+
+    memory_parser = subparsers.add_parser(
+        "memory",
+        help="Compare peak memory of writing publications as one string and streamed",
+    )
+    memory_parser.add_argument(
+        "--entries",
+        type=_parse_sizes,
+        default=[1000, 5000],
+        help="Comma-separated bibliography sizes (default: 1000,5000)",
+    )
+    memory_parser.add_argument(
+        "--seed", type=int, default=0, help="Random seed (default: 0)"
+    )
+
+    generate_parser = subparsers.add_parser(
+        "generate", help="Write a synthetic BibTeX bibliography"
+    )
+    generate_parser.add_argument(
+        "--entries", type=int, default=1000, help="Number of entries (default: 1000)"
+    )
+    generate_parser.add_argument(
+        "--seed", type=int, default=0, help="Random seed (default: 0)"
+    )
+    generate_parser.add_argument(
+        "-o", "--output", type=Path, help="Output path (default: stdout)"
+    )
+    args = parser.parse_args()
+
+    if args.benchmark == "citation":
+        bench_citation(args.count, args.authors, args.dois, args.repeat, args.seed)
+    elif args.benchmark == "highlight":
+        bench_highlight(args.count, args.names, args.repeat, args.seed)
+    elif args.benchmark == "pipeline":
+        bench_pipeline(
+            args.entries,
+            args.repeat,
+            args.seed,
+            args.baseline,
+            args.save_baseline,
+            args.tolerance,
+        )
+    elif args.benchmark == "startup":
+        bench_startup(args.repeat, args.top)
+    elif args.benchmark == "merge":
+        bench_merge(args.entries, args.sources, args.overlap, args.repeat, args.seed)
+    elif args.benchmark == "links":
+        bench_links(
+            args.count,
+            args.hosts,
+            args.delay,
+            args.concurrency,
+            args.per_host,
+            args.seed,
+        )
+    elif args.benchmark == "memory":
+        bench_memory(args.entries, args.seed)
+    elif args.benchmark == "generate":
+        bibliography = generate_bibliography(args.entries, args.seed)
+        if args.output:
+            args.output.write_text(bibliography, encoding="utf-8")
+        else:
+            sys.stdout.write(bibliography)
+
+
+if __name__ == "__main__":
+    main()
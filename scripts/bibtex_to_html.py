@@ -4,13 +4,39 @@ Convert BibTeX file to HTML and inject into index.html
 """
 
 import argparse
+import contextlib
+import filecmp
+import functools
+import glob
+import hashlib
+import heapq
 import html
+import importlib
+import itertools
+import json
+import mmap
+import os
+import pickle
 import re
+import stat
 import sys
+import tempfile
+import time
+import unicodedata
+from collections import OrderedDict
 from pathlib import Path
-from pybtex.database import parse_file
-from pybtex.plugin import find_plugin
-from pybtex.richtext import Text
+
+# pybtex, the APA7 style, multiprocessing, cProfile and the daemon are imported
+# where they are used, so --help and runs that need no formatting start quickly
+
+from scripts.profiling import (
+    BuildProfile,
+    is_profiling,
+    profiling,
+    record_entry,
+    record_stages,
+    stage,
+)
 
 # Month name to number mapping for sorting
 _MONTH_MAP = {
@@ -51,134 +77,265 @@ _MONTH_MAP = {
     "12": 12,
 }
 
+# Bump whenever the rendered HTML changes so stale cache entries are discarded
+_RENDER_CACHE_VERSION = 2
+
+# Bump whenever the layout of parse snapshots changes
+_SNAPSHOT_VERSION = 2
+
+# Version of the plugin location cache format
+_PLUGIN_CACHE_VERSION = 1
+
+# Below this many entries per worker, process start-up costs more than it saves
+_MIN_ENTRIES_PER_JOB = 50
+
+# Entries rendered at a time when streaming; bounds the fragments held in memory
+_STREAM_CHUNK_SIZE = 1000
+
+# Upper bound on memoized author names; large enough for a lab-wide bibliography
+_NAME_CACHE_SIZE = 16384
+
+# Placeholder that marks shared first authors until the citation is rendered to HTML
+_ASTERISK_PLACEHOLDER = "__ASTERISK_PLACEHOLDER__"
+
+# Author whose first-author publications are selected by default
+_DEFAULT_AUTHOR = "Schaub, Darius P."
+
+# Sentinel for publication records whose authors have not been formatted yet
+_UNFORMATTED = object()
+
+# Search index format written by write_search_index and read by search.js
+_SEARCH_INDEX_VERSION = 1
+_SEARCH_TOKEN_SPLIT = re.compile(r"[^a-z0-9]+")
+
+# Markers delimiting the publications section of a page
+_SECTION_START = '<section id="publications">'
+_SECTION_END = "</section>"
+
+# Marker of shared first authors, and the note explaining it below the list
+_SHARED_FIRST_AUTHOR_MARK = "<sup>*</sup>"
+_EQUAL_CONTRIBUTION_NOTE = '\n            <p class="publication-note" style="font-size: 0.9em; text-align: right;"><strong>*</strong> indicates equal contribution</p>'
+
+# Formatted names highlighted by default, as produced for _DEFAULT_AUTHOR
+_DEFAULT_HIGHLIGHT_NAMES = ("Schaub, D. P.", "Schaub, D.")
+
+# Citation spans that need rewriting besides author names, as alternatives of one
+# pattern so a citation is rewritten in a single scan. The pattern is matched on
+# the html.escape'd citation: these tokens contain no characters html.escape
+# changes, and highlighted names are escaped before they are compiled in.
+_CITATION_INLINE_TOKENS = (
+    # Month in the date: (2025 , January) -> (2025), since APA shows only the year
+    r"(?P<date>\((?P<date_year>\d{4})\s*,\s*[A-Za-z]+\s*\))"
+    # DOI: 10.xxxx/xxxx, matched until whitespace, an escaped character or end of string
+    r"|(?P<doi>doi:(?P<doi_value>[0-9]+\.[0-9]+/[^\s<>\"'&]+))"
+)
+
+# The title is everything after "(Year). " up to the first period that is not
+# directly followed by a capital letter (so "U.S." style abbreviations are skipped).
+_CITATION_TITLE_TOKEN = (
+    r"(?P<title>\((?P<title_year>\d{4})(?:\s*,\s*[A-Za-z]+\s*)?\)(?P<title_sep>\.\s+)"
+    r"(?P<title_text>.+?\.)(?![A-Z]))"
+)
+
+
+def _name_atoms(name):
+    """Split a formatted name into regex atoms; a space after an initial matches any whitespace"""
+    return [
+        r"\s*" if char == " " and name[i - 1 : i] == "." else re.escape(char)
+        for i, char in enumerate(name)
+    ]
+
+
+def _names_regex(names):
+    """Compile names into one alternation factored by common prefixes, preferring the longest match"""
+    # Shared prefixes (e.g. "Schaub, D." and "Schaub, D. P.") are matched once, so
+    # the cost of a position stays flat as the list of names grows
+    trie = {}
+    for name in names:
+        node = trie
+        for atom in _name_atoms(name):
+            node = node.setdefault(atom, {})
+        node[None] = {}
+
+    def emit(node):
+        branches = [atom + emit(child) for atom, child in node.items() if atom]
+        if not branches:
+            return ""
+        body = "(?:" + "|".join(branches) + ")" if len(branches) > 1 else branches[0]
+        # A name may end here: the greedy "?" still tries the longer names first
+        if None in node:
+            return "(?:" + body + ")?" if len(branches) == 1 else body + "?"
+        return body
+
+    return emit(trie)
+
+
+def _guarded(tokens, names, extra_chars):
+    """Prefix tokens with a lookahead on their possible first characters"""
+    # Lets the scanner reject most positions with a single character class test
+    # instead of trying every alternative
+    first_chars = sorted(set(extra_chars) | {name[0] for name in names})
+    return (
+        "(?=["
+        + "".join(re.escape(char) for char in first_chars)
+        + "])(?:"
+        + tokens
+        + ")"
+    )
+
+
+@functools.lru_cache(maxsize=32)
+def _citation_rewriter(highlight_names):
+    """Build a function rendering a plain-text citation to HTML with the given names bolded"""
+    tokens = _CITATION_INLINE_TOKENS
+    # Names are matched on the escaped citation, e.g. "O'Brien" as "O&#x27;Brien"
+    highlight_names = tuple(html.escape(name) for name in highlight_names)
+    if highlight_names:
+        # Highlighted author name, followed by an optional shared first author marker
+        tokens += (
+            r"|(?P<name>(?P<name_text>" + _names_regex(highlight_names) + r")"
+            r"(?P<name_star>" + _ASTERISK_PLACEHOLDER + r")?)"
+        )
+    tokens += r"|(?P<star>" + _ASTERISK_PLACEHOLDER + r")"
+    inline_pattern = re.compile(_guarded(tokens, highlight_names, "(d_"))
+    pattern = re.compile(
+        _guarded(_CITATION_TITLE_TOKEN + "|" + tokens, highlight_names, "(d_")
+    )
+
+    def render_token(match):
+        """Render the HTML for a single token matched by the citation patterns"""
+        kind = match.lastgroup
+        if kind == "title":
+            title_html = inline_pattern.sub(render_token, match.group("title_text"))
+            return (
+                f"({match.group('title_year')}){match.group('title_sep')}"
+                f"<strong>{title_html}</strong>"
+            )
+        if kind == "date":
+            return f"({match.group('date_year')})"
+        if kind == "doi":
+            doi_value = match.group("doi_value")
+            return f'<a href="https://doi.org/{doi_value}" target="_blank" rel="noopener noreferrer">doi:{doi_value}</a>'
+        if kind == "name":
+            star = "<sup>*</sup>" if match.group("name_star") else ""
+            return f"<strong>{match.group('name_text')}{star}</strong>"
+        return "<sup>*</sup>"
+
+    def render(citation_str):
+        return pattern.sub(render_token, html.escape(citation_str))
+
+    return render
+
+
+def _render_citation_text(citation_str, highlight_names=_DEFAULT_HIGHLIGHT_NAMES):
+    """Escape a plain-text citation and rewrite its title, date, DOI and author tokens to HTML"""
+    return _citation_rewriter(highlight_names)(citation_str)
+
 
 def _process_citation_html(
-    citation_text, entry, style, backend, bib_data, usera_count=0
+    citation_text, publication, highlight_names=_DEFAULT_HIGHLIGHT_NAMES
 ):
     """
     Post-process citation text to:
     1. Remove month from date (APA style shows only year for journal articles)
     2. Make title bold
     3. Make DOI links clickable
-    4. Make author name (Schaub, D. P. or Schaub, D.) bold
+    4. Make highlighted author names (e.g. Schaub, D. P. or Schaub, D.) bold
     5. Add superscript asterisks for shared first authors
 
     Args:
         citation_text: Plain text citation string
-        entry: BibTeX entry object
-        style: Citation style object
-        backend: Backend object for rendering
-        bib_data: Bibliography data object
-        usera_count: Number of shared first authors (default: 0)
+        publication: _Publication record of the entry
+        highlight_names: Formatted author names to make bold
 
     Returns:
-        HTML string with clickable DOIs, bold author name, and shared first author stars
+        HTML string with clickable DOIs, bold author names, and shared first author stars
     """
     citation_str = str(citation_text)
 
     # Add superscript asterisks for shared first authors using raw author list
-    if usera_count > 0:
+    if publication.usera_count > 0:
         citation_str = _add_shared_first_author_stars_citation(
-            citation_str, entry, style, backend, bib_data, usera_count
+            citation_str, publication
         )
 
-    # Remove month from date - APA style shows only year for journal articles
-    # Pattern: (YYYY , Month) -> (YYYY)
-    # Handle various month formats and spacing
-    date_pattern = r"\((\d{4})\s*,\s*[A-Za-z]+\s*\)"
-    citation_str = re.sub(date_pattern, r"(\1)", citation_str)
+    return _render_citation_text(citation_str, highlight_names)
 
-    # Make title bold - title comes after (Year). and ends before journal name or end
-    # Pattern: (Year). Title. [Journal or end]
-    # The title is everything after "(Year). " until ". " followed by journal or end
-    # Journal names typically start with a capital letter after ". "
 
-    # Use a single pattern that matches title ending with period, followed by either:
-    # 1. Space + capital letter (journal name starts)
-    # 2. End of string or non-capital content (no journal)
-    # Use non-greedy match to get the shortest title (up to first period before journal/end)
-    title_pattern = (
-        r"(\((\d{4})\)\.\s+)(.+?\.)(?=\s+[A-Z][a-zA-Z\s&,]+(?:,|\.)|\s*[^A-Z]|$)"
-    )
+# Rendered author names shared by card mode, citation mode and the selected-only
+# filter. Name formatting only depends on the person and the style settings, so
+# prolific co-authors are formatted once per run.
+_name_cache = OrderedDict()
+_name_cache_stats = {"hits": 0, "misses": 0}
 
-    def bold_title(match):
-        year_part = match.group(1)  # "(2025). "
-        title = match.group(3)  # The title text (ends with period)
-        return f"{year_part}__TITLE_START__{title}__TITLE_END__"
 
-    citation_str = re.sub(title_pattern, bold_title, citation_str)
-
-    doi_replacements = []  # Store DOI replacements
-
-    # Process DOIs FIRST (before HTML escaping) for more reliable matching
-    # Pattern: doi:10.xxxxx (DOI format)
-    # DOI format: 10.xxxx/xxxx where xxxx can contain letters, numbers, dots, slashes, hyphens
-    # Match until whitespace or end of string
-    doi_pattern = r'doi:([0-9]+\.[0-9]+/[^\s<>"\'&]+)'
-
-    def replace_doi_placeholder(match):
-        doi_value = match.group(1)
-        placeholder = f"__DOI_PLACEHOLDER_{len(doi_replacements)}__"
-        doi_replacements.append(doi_value)
-        return placeholder
+def _cached_name(key, compute):
+    """Look up key in the bounded name cache, computing and storing it on a miss"""
+    try:
+        value = _name_cache[key]
+    except KeyError:
+        _name_cache_stats["misses"] += 1
+        value = _name_cache[key] = compute()
+        if len(_name_cache) > _NAME_CACHE_SIZE:
+            _name_cache.popitem(last=False)
+        return value
+    _name_cache_stats["hits"] += 1
+    _name_cache.move_to_end(key)
+    return value
+
+
+def _name_style_key(style):
+    """Identify the style settings that affect how a name is formatted"""
+    return (
+        type(style).__name__,
+        type(style.name_style).__name__,
+        style.abbreviate_names,
+    )
 
-    citation_str = re.sub(doi_pattern, replace_doi_placeholder, citation_str)
 
-    # Process author names (before HTML escaping) to avoid regex complexity
-    # Match longer pattern first: "Schaub, D. P." (with flexible spacing)
-    citation_str = re.sub(
-        r"(Schaub, D\.\s*P\.)",
-        r"__SCH_AUB_D_P__",  # Temporary placeholder
-        citation_str,
-    )
-    # Then match shorter pattern: "Schaub, D." (only remaining instances, not followed by P.)
-    citation_str = re.sub(
-        r"(Schaub, D\.)(?!\s*P\.)",
-        r"__SCH_AUB_D__",  # Temporary placeholder
-        citation_str,
+def _person_key(person):
+    """Normalize a Person into a hashable tuple of its name parts"""
+    return (
+        tuple(person.first_names),
+        tuple(person.middle_names),
+        tuple(person.prelast_names),
+        tuple(person.last_names),
+        tuple(person.lineage_names),
     )
 
-    # Now escape HTML
-    citation_html = html.escape(citation_str)
 
-    # Replace asterisk placeholders with actual HTML superscript tags FIRST
-    citation_html = citation_html.replace(
-        html.escape("__ASTERISK_PLACEHOLDER__"), "<sup>*</sup>"
+def _format_name_text(person, style, context):
+    """Format a person's name to rich text, memoized across entries"""
+    return _cached_name(
+        ("text", _name_style_key(style), _person_key(person)),
+        lambda: style.format_name(person, style.abbreviate_names).format_data(context),
     )
 
-    # Replace author name placeholders with HTML tags, including asterisk if immediately after
-    # Match "Schaub, D. P." followed by optional asterisk
-    citation_html = re.sub(
-        r"__SCH_AUB_D_P__(<sup>\*</sup>)?",
-        r"<strong>Schaub, D. P.\1</strong>",
-        citation_html,
-    )
-    # Match "Schaub, D." followed by optional asterisk
-    citation_html = re.sub(
-        r"__SCH_AUB_D__(<sup>\*</sup>)?",
-        r"<strong>Schaub, D.\1</strong>",
-        citation_html,
-    )
 
-    # Replace title placeholders with bold tags
-    citation_html = re.sub(
-        r"__TITLE_START__([^_]+)__TITLE_END__", r"<strong>\1</strong>", citation_html
+def _format_name(person, style, backend, context):
+    """Format a person's name to a rendered string, memoized across entries"""
+    return _cached_name(
+        ("str", _name_style_key(style), type(backend).__name__, _person_key(person)),
+        lambda: str(_format_name_text(person, style, context).render(backend)),
     )
 
-    # Replace DOI placeholders with actual links
-    for i, doi_value in enumerate(doi_replacements):
-        placeholder = f"__DOI_PLACEHOLDER_{i}__"
-        doi_url = f"https://doi.org/{doi_value}"
-        link_html = f'<a href="{html.escape(doi_url)}" target="_blank" rel="noopener noreferrer">doi:{html.escape(doi_value)}</a>'
-        citation_html = citation_html.replace(html.escape(placeholder), link_html)
 
-    return citation_html
+def _name_cache_report():
+    """Summarize author name cache usage for verbose output"""
+    hits = _name_cache_stats["hits"]
+    lookups = hits + _name_cache_stats["misses"]
+    hit_rate = 100 * hits / lookups if lookups else 0
+    return (
+        f"Author name cache: {hits}/{lookups} hits ({hit_rate:.1f}%), "
+        f"{len(_name_cache)} names cached"
+    )
 
 
 def _patch_apa7_style():
     """Monkey patch to fix bug in pybtex-apa7-style where richtext.Text is used instead of Text"""
     try:
         import formatting.apa as apa_module
+        from pybtex.richtext import Text
         from pybtex.style.template import join, FieldIsMissing, node
 
         # Create patched version that maintains the @node decorator behavior
@@ -196,16 +353,14 @@ def _patch_apa7_style():
 
             if len(persons) > 20:
                 formatted_names = [
-                    style.format_name(person, style.abbreviate_names)
-                    for person in persons[:20]
+                    _format_name_text(person, style, context) for person in persons[:20]
                 ]
                 # Fix: use Text instead of richtext.Text
                 formatted_names += [Text("et al.")]
                 return join(sep=", ")[formatted_names].format_data(context)
             else:
                 formatted_names = [
-                    style.format_name(person, style.abbreviate_names)
-                    for person in persons
+                    _format_name_text(person, style, context) for person in persons
                 ]
                 return join(sep=", ", sep2=" & ", last_sep=", & ")[
                     formatted_names
@@ -230,34 +385,67 @@ def _get_usera_count(entry):
     return 0
 
 
-def _is_first_author_publication(entry, style, backend, bib_data):
-    """Check if entry qualifies as first-author publication"""
-    # Check if usera field exists and is non-empty (shared first authorship)
-    if _get_usera_count(entry) > 0:
-        return True
+def _first_author_names(author, style, backend):
+    """Formatted names that count as the highlighted author, e.g. "Schaub, D. P." and "Schaub, D." """
+    from pybtex.database import Person
 
-    # Check if first author is "Schaub, D. P." or "Schaub, D."
-    try:
+    person = Person(author)
+    names = {_format_name(person, style, backend, {})}
+    if person.middle_names:
+        # Also accept the first initial alone
+        short = Person(first=person.first_names[0], last=" ".join(person.last_names))
+        names.add(_format_name(short, style, backend, {}))
+    return frozenset(names)
+
+
+def _highlight_names(authors, style, backend):
+    """Formatted names to bold for a list of "Last, First M." authors, as a hashable tuple"""
+    names = set()
+    for author in authors:
+        names.update(_first_author_names(author, style, backend))
+    return tuple(sorted(names))
+
+
+def _plain_last_name(person):
+    """Raw last name of a person, or None if formatting could render it differently"""
+    if person.prelast_names or person.lineage_names:
+        return None
+    last_name = " ".join(person.last_names)
+    # Braces, TeX commands and ties are only resolved by full formatting
+    if any(char in last_name for char in "{}\\~"):
+        return None
+    return last_name
+
+
+def _first_author_filter(author, style, backend):
+    """Return a predicate selecting first-author publications of the highlighted author"""
+    from pybtex.database import Person
+
+    names = _first_author_names(author, style, backend)
+    last_name = _plain_last_name(Person(author))
+
+    def is_first_author_publication(entry):
+        # With shared first authorship (usera field) the first usera_count
+        # authors all count as first author
         persons = entry.persons.get("author", [])
-        if not persons:
-            return False
-
-        context = {
-            "entry": entry,
-            "style": style,
-            "bib_data": bib_data,
-        }
-
-        # Format first author name
-        first_person = persons[0]
-        formatted_name = style.format_name(first_person, style.abbreviate_names)
-        name_str = str(formatted_name.format_data(context).render(backend))
-
-        # Check if it matches "Schaub, D. P." or "Schaub, D."
-        return name_str in ("Schaub, D. P.", "Schaub, D.")
-    except Exception:
+        first_authors = persons[: max(1, _get_usera_count(entry))]
+        for person in first_authors:
+            # Cheap rejection: a plain raw last name that differs from the highlighted
+            # author's formats differently too, so most entries never reach pybtex
+            raw_last_name = _plain_last_name(person)
+            if last_name and raw_last_name and raw_last_name != last_name:
+                continue
+
+            try:
+                context = {"entry": entry, "style": style}
+                if _format_name(person, style, backend, context) in names:
+                    return True
+            except Exception:
+                continue
         return False
 
+    return is_first_author_publication
+
 
 def _join_author_names(formatted_name_strings):
     """Join formatted author names with appropriate separators (APA style)"""
@@ -273,47 +461,42 @@ def _join_author_names(formatted_name_strings):
         return result
 
 
-def _format_author_names(entry, style, backend, bib_data, usera_count, asterisk_marker):
-    """Format author names from BibTeX entry and add asterisk markers to first N authors"""
+def _format_author_names(entry, style, backend, bib_data):
+    """Format author names from BibTeX entry"""
     persons = entry.persons.get("author", [])
     if not persons:
-        return []
+        return ()
 
     context = {
         "entry": entry,
         "style": style,
         "bib_data": bib_data,
     }
+    return tuple(_format_name(person, style, backend, context) for person in persons)
 
-    formatted_name_strings = []
-    for i, person in enumerate(persons):
-        formatted_name = style.format_name(person, style.abbreviate_names)
-        name_str = str(formatted_name.format_data(context).render(backend))
-        if i < usera_count:
-            name_str += asterisk_marker
-        formatted_name_strings.append(name_str)
 
-    return formatted_name_strings
+def _mark_shared_first_authors(author_names, usera_count, asterisk_marker):
+    """Add asterisk markers to the first N formatted author names"""
+    return [
+        name_str + asterisk_marker if i < usera_count else name_str
+        for i, name_str in enumerate(author_names)
+    ]
 
 
-def _format_authors_for_citation(entry, style, backend, bib_data, usera_count):
-    """Format authors from BibTeX entry for citation mode, adding asterisk placeholders to first N authors"""
-    try:
-        formatted_name_strings = _format_author_names(
-            entry, style, backend, bib_data, usera_count, "__ASTERISK_PLACEHOLDER__"
-        )
-        return (
-            _join_author_names(formatted_name_strings) if formatted_name_strings else ""
-        )
-    except Exception:
+def _format_authors_for_citation(publication):
+    """Join a publication's authors for citation mode, adding asterisk placeholders to first N authors"""
+    if not publication.authors:
         return ""
+    return _join_author_names(
+        _mark_shared_first_authors(
+            publication.authors, publication.usera_count, _ASTERISK_PLACEHOLDER
+        )
+    )
 
 
-def _add_shared_first_author_stars_citation(
-    citation_str, entry, style, backend, bib_data, usera_count
-):
+def _add_shared_first_author_stars_citation(citation_str, publication):
     """Add superscript asterisks to the first N authors in a citation string"""
-    if not citation_str or usera_count <= 0:
+    if not citation_str or publication.usera_count <= 0:
         return citation_str
 
     # Find the authors part (everything before the year in parentheses)
@@ -327,45 +510,35 @@ def _add_shared_first_author_stars_citation(
     rest_of_citation = citation_str[year_match.start() :]
 
     # Format authors with asterisk placeholders from the raw entry
-    authors_with_stars = _format_authors_for_citation(
-        entry, style, backend, bib_data, usera_count
-    )
+    authors_with_stars = _format_authors_for_citation(publication)
 
     # Reconstruct the citation
     return authors_with_stars + rest_of_citation
 
 
-def _bold_author_name(text):
-    """Make author name (Schaub, D. P. or Schaub, D.) bold in text, including asterisk if present"""
-    # Match "Schaub, D. P." with optional asterisk (longer pattern first)
-    text = re.sub(
-        r"(Schaub, D\.\s*P\.)(<sup>\*</sup>)?",
-        r"<strong>\1\2</strong>",
-        text,
-    )
-    # Match "Schaub, D." (not followed by P.) with optional asterisk
-    text = re.sub(
-        r"(Schaub, D\.)(?!\s*P\.)(<sup>\*</sup>)?",
-        r"<strong>\1\2</strong>",
-        text,
-    )
-    return text
+@functools.lru_cache(maxsize=32)
+def _card_highlight_pattern(highlight_names):
+    """Compile the highlighted names, with an optional asterisk, into one pattern"""
+    return re.compile(r"(" + _names_regex(highlight_names) + r")(<sup>\*</sup>)?")
 
 
-def _format_authors(entry, style, backend, bib_data):
-    """Format authors from BibTeX entry"""
-    try:
-        usera_count = _get_usera_count(entry)
-        formatted_name_strings = _format_author_names(
-            entry, style, backend, bib_data, usera_count, "<sup>*</sup>"
-        )
-        if not formatted_name_strings:
-            return ""
+def _bold_author_name(text, highlight_names=_DEFAULT_HIGHLIGHT_NAMES):
+    """Make highlighted author names bold in text, including asterisk if present"""
+    if not highlight_names:
+        return text
+    return _card_highlight_pattern(highlight_names).sub(r"<strong>\1\2</strong>", text)
+
 
-        authors_str = _join_author_names(formatted_name_strings)
-        return _bold_author_name(authors_str)
-    except Exception:
+def _format_authors(publication, highlight_names=_DEFAULT_HIGHLIGHT_NAMES):
+    """Join a publication's authors for card mode with shared first author markers"""
+    if not publication.authors:
         return ""
+    authors_str = _join_author_names(
+        _mark_shared_first_authors(
+            publication.authors, publication.usera_count, "<sup>*</sup>"
+        )
+    )
+    return _bold_author_name(authors_str, highlight_names)
 
 
 def _clean_title(title):
@@ -436,83 +609,839 @@ def _get_sort_key(entry_item):
     return (year, month)
 
 
-def _parse_and_sort_bibtex(bibtex_path, selected_only=False):
-    """Parse BibTeX file and return sorted entries with style/backend setup"""
-    _patch_apa7_style()
+class _Publication:
+    """Fields both renderers need, extracted once from a pybtex entry"""
+
+    __slots__ = (
+        "key",
+        "entry",
+        "title",
+        "journal",
+        "year_label",
+        "link_url",
+        "link_text",
+        "doi",
+        "usera_count",
+        "_authors",
+        "_format_context",
+    )
 
-    bib_data = parse_file(str(bibtex_path), bib_format="bibtex")
-    if not bib_data.entries:
-        return None, None, None, None
+    def __init__(self, key, entry, style, backend, bib_data):
+        fields = entry.fields
+        self.key = key
+        # Kept for citation mode, which formats the whole entry through pybtex
+        self.entry = entry
+        self.title = _clean_title(fields.get("title", "").strip())
+        self.journal = _get_journal(entry)
+        self.year_label = fields.get("year", "").strip()
+        self.link_url, self.link_text = _get_link_info(entry)
+        self.doi = fields.get("doi", "")
+        self.usera_count = _get_usera_count(entry)
+        self._authors = _UNFORMATTED
+        self._format_context = (style, backend, bib_data)
+
+    @property
+    def authors(self):
+        """Formatted author names without markers, None if formatting failed"""
+        # Formatted on first use: citation mode only needs them for shared first authors
+        if self._authors is _UNFORMATTED:
+            try:
+                self._authors = _format_author_names(self.entry, *self._format_context)
+            except Exception:
+                self._authors = None
+        return self._authors
 
-    style = find_plugin("pybtex.style.formatting", "apa7")()
-    backend = find_plugin("pybtex.backends", "plaintext")()
 
-    sorted_entries = sorted(
-        bib_data.entries.items(),
-        key=_get_sort_key,
-        reverse=True,
-    )
+def _parse_keyed_entries(bibtex_path):
+    """Parse BibTeX file and return (sort_key, key, entry) tuples in file order"""
+    from pybtex.database import parse_file
+
+    with stage("parse_file"):
+        bib_data = parse_file(str(bibtex_path), bib_format="bibtex")
+    with stage("sort_keys"):
+        return [
+            (_get_sort_key(item), item[0], item[1]) for item in bib_data.entries.items()
+        ]
+
 
-    # Filter to first-author publications if selected_only is True
-    if selected_only:
-        sorted_entries = [
+def _in_year_window(sort_key, since=None, until=None):
+    """Check if an entry's year lies within [since, until]; entries without a year are excluded"""
+    year = sort_key[0]
+    if since is None and until is None:
+        return True
+    if not year:
+        return False
+    return (since is None or year >= since) and (until is None or year <= until)
+
+
+def _sort_newest_first(keyed_entries):
+    """Fully sort (sort_key, key, entry) tuples into (key, entry) pairs, newest first"""
+    with stage("sort"):
+        # Stable, so entries from the same month keep their file order
+        return [
             (key, entry)
-            for key, entry in sorted_entries
-            if _is_first_author_publication(entry, style, backend, bib_data)
+            for _, key, entry in sorted(
+                keyed_entries, key=lambda keyed: keyed[0], reverse=True
+            )
         ]
 
-    from pybtex.database import BibliographyData
 
-    sorted_bib_data = BibliographyData({key: entry for key, entry in sorted_entries})
+def _iter_newest_first(keyed_entries):
+    """Lazily yield (key, entry) pairs newest first from a heap"""
+    # Heapify is O(n) and each pop O(log n), so taking the first k entries never
+    # sorts the rest; the index breaks ties in file order, like the stable sort
+    heap = [
+        (-year, -month, index)
+        for index, ((year, month), _, _) in enumerate(keyed_entries)
+    ]
+    heapq.heapify(heap)
+    while heap:
+        _, key, entry = keyed_entries[heapq.heappop(heap)[2]]
+        yield key, entry
 
-    return sorted_entries, style, backend, sorted_bib_data
 
+def _file_sha256(path):
+    """Hash file contents in chunks"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
 
-def parse_bibtex_card_mode(bibtex_path, selected_only=False):
-    """Parse BibTeX file and return formatted HTML in card mode with visual prioritization"""
+
+def _snapshot_path(cache_dir, bibtex_path):
+    """Snapshot file for a BibTeX file, unique per absolute path"""
+    bibtex_path = Path(bibtex_path)
+    tag = hashlib.sha1(str(bibtex_path.resolve()).encode("utf-8")).hexdigest()[:12]
+    return Path(cache_dir) / f"{bibtex_path.stem}-{tag}.snapshot"
+
+
+def _read_snapshot(snapshot_path):
+    """Load a parse snapshot, returning None if missing, corrupt or outdated"""
+    import pybtex
+
+    try:
+        with open(snapshot_path, "rb") as f:
+            snapshot = pickle.load(f)
+        if (
+            snapshot.get("version") == _SNAPSHOT_VERSION
+            and snapshot.get("pybtex") == pybtex.__version__
+        ):
+            return snapshot
+    except (OSError, EOFError, pickle.UnpicklingError, AttributeError, ImportError):
+        pass
+    return None
+
+
+# Permissions of newly created files: mkstemp creates them private (0600), while
+# open() would apply the umask to 0666. The umask can only be read by setting it.
+_UMASK = os.umask(0)
+os.umask(_UMASK)
+
+
+def _write_atomically(path, write, mode="wb", encoding=None, unless_equal=False):
+    """
+    Write a file through a temporary file renamed over it; return whether it was replaced.
+
+    write(f) fills the temporary file, which is unique to this writer, so serve
+    --watch, the daemon and CLI builds writing the same file at once each rename
+    a complete file. An existing file keeps its permissions; with unless_equal,
+    it is left untouched (mtime included) if the new content is the same.
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(
+        dir=path.parent, prefix=f".{path.name}.", suffix=".tmp"
+    )
+    try:
+        with open(fd, mode, encoding=encoding) as f:
+            write(f)
+        try:
+            file_mode = stat.S_IMODE(os.stat(path).st_mode)
+        except FileNotFoundError:
+            file_mode = 0o666 & ~_UMASK
+        else:
+            if unless_equal and filecmp.cmp(tmp_path, path, shallow=False):
+                os.unlink(tmp_path)
+                return False
+        os.chmod(tmp_path, file_mode)
+        os.replace(tmp_path, path)
+    except BaseException:
+        with contextlib.suppress(FileNotFoundError):
+            os.unlink(tmp_path)
+        raise
+    return True
+
+
+def _write_snapshot(snapshot_path, snapshot):
+    """Write a parse snapshot atomically"""
     try:
-        sorted_entries, style, backend, sorted_bib_data = _parse_and_sort_bibtex(
-            bibtex_path, selected_only
+        _write_atomically(
+            snapshot_path,
+            lambda f: pickle.dump(snapshot, f, protocol=pickle.HIGHEST_PROTOCOL),
         )
-        if sorted_entries is None:
-            return "<p>No publications found.</p>"
-
-        html_parts = []
-        for key, entry in sorted_entries:
-            title = _clean_title(entry.fields.get("title", "").strip())
-            journal = _get_journal(entry)
-            year = entry.fields.get("year", "").strip()
-            link_url, link_text = _get_link_info(entry)
-            authors = _format_authors(entry, style, backend, sorted_bib_data)
-
-            # Build HTML structure
-            parts = ['                <div class="publication-card">']
-
-            journal_display = _format_journal_display(journal, year)
-            if journal_display:
-                parts.append(
-                    f'                    <div class="publication-journal">{html.escape(journal_display)}</div>'
-                )
+    except OSError as e:
+        print(f"Warning: could not write parse snapshot: {e}", file=sys.stderr)
+
+
+# Resolved pybtex plugin classes, by (group, name)
+_plugins = {}
+
+# Patched APA7 style and plaintext backend, created once per process
+_style_and_backend = None
+
+# Snapshots and render caches kept in memory by long-running processes (serve
+# --watch, the --daemon), keyed by their path
+_resident_snapshots = {}
+_resident_render_caches = {}
+
+# Counts of the merge of several BibTeX files in the current build, for --verbose
+_merge_stats = {}
+
+# TeX accent and formatting commands and braces, dropped when comparing fields
+_TEX_MARKUP_PATTERN = re.compile(r"\\(?:[a-zA-Z]+|.)|[{}]")
+_IDENTITY_WORD_PATTERN = re.compile(r"[a-z0-9]+")
+_DOI_PREFIX_PATTERN = re.compile(
+    r"^(?:https?://(?:dx\.)?doi\.org/|doi:\s*)", re.IGNORECASE
+)
+
+
+def _snapshot_entries(bibtex_path, cache_dir, file_stat):
+    """Return the (sort_key, key, entry) tuples of a valid snapshot of the file, or None"""
+    snapshot_path = _snapshot_path(cache_dir, bibtex_path)
+    snapshot = _resident_snapshots.get(snapshot_path) or _read_snapshot(snapshot_path)
+    if snapshot is None:
+        return None
+    _resident_snapshots[snapshot_path] = snapshot
+
+    # Size and mtime are trusted only if the file was not modified in the same
+    # second the snapshot was taken; otherwise confirm with a content hash
+    if snapshot["size"] != file_stat.st_size:
+        return None
+    if (
+        snapshot["mtime_ns"] == file_stat.st_mtime_ns
+        and file_stat.st_mtime_ns < snapshot["written_ns"] - 1_000_000_000
+    ):
+        return snapshot["entries"]
+    if snapshot["sha256"] == _file_sha256(bibtex_path):
+        snapshot["mtime_ns"] = file_stat.st_mtime_ns
+        snapshot["written_ns"] = time.time_ns()
+        _write_snapshot(snapshot_path, snapshot)
+        return snapshot["entries"]
+    return None
+
+
+def _store_snapshot(bibtex_path, cache_dir, file_stat, keyed_entries):
+    """Record freshly parsed entries of a file, as of file_stat, in memory and on disk"""
+    import pybtex
+
+    snapshot_path = _snapshot_path(cache_dir, bibtex_path)
+    snapshot = {
+        "version": _SNAPSHOT_VERSION,
+        "pybtex": pybtex.__version__,
+        "size": file_stat.st_size,
+        "mtime_ns": file_stat.st_mtime_ns,
+        "written_ns": time.time_ns(),
+        "sha256": _file_sha256(bibtex_path),
+        "entries": keyed_entries,
+    }
+    _resident_snapshots[snapshot_path] = snapshot
+    _write_snapshot(snapshot_path, snapshot)
+
+
+def _load_keyed_entries(bibtex_path, cache_dir=None):
+    """Return (sort_key, key, entry) tuples, reusing a snapshot if the file is unchanged"""
+    if cache_dir is None:
+        return _parse_keyed_entries(bibtex_path)
+
+    file_stat = os.stat(bibtex_path)
+    keyed_entries = _snapshot_entries(bibtex_path, cache_dir, file_stat)
+    if keyed_entries is None:
+        keyed_entries = _parse_keyed_entries(bibtex_path)
+        _store_snapshot(bibtex_path, cache_dir, file_stat, keyed_entries)
+    return keyed_entries
+
+
+def _bibtex_files(sources):
+    """Expand BibTeX files and directories (searched recursively, in name order) into files"""
+    files = {}
+    for source in sources:
+        source = Path(source)
+        paths = sorted(source.rglob("*.bib")) if source.is_dir() else [source]
+        for path in paths:
+            # A file reached through several sources is loaded once, at its first position
+            files.setdefault(path.resolve(), path)
+    return list(files.values())
+
+
+def _normalized_words(text):
+    """Lowercase, accent-free words of a BibTeX field, ignoring TeX commands and braces"""
+    # Unlike search terms, single letters and digits are kept: "Part 1" and
+    # "Part 2" are different publications
+    decomposed = unicodedata.normalize("NFKD", _TEX_MARKUP_PATTERN.sub("", text))
+    plain = "".join(char for char in decomposed if not unicodedata.combining(char))
+    return " ".join(_IDENTITY_WORD_PATTERN.findall(plain.lower()))
+
+
+def _entry_identities(sort_key, key, entry):
+    """Hashable identities under which an entry duplicates another one"""
+    # pybtex compares citation keys case-insensitively
+    identities = [("key", key.lower())]
+    doi = _DOI_PREFIX_PATTERN.sub("", entry.fields.get("doi", "").strip()).lower()
+    if doi:
+        identities.append(("doi", doi))
+    title = _normalized_words(entry.fields.get("title", ""))
+    if title:
+        authors = entry.persons.get("author")
+        first_author = (
+            _normalized_words(" ".join(authors[0].last_names)) if authors else ""
+        )
+        identities.append(("title", title, sort_key[0], first_author))
+    return identities
 
-            parts.extend(
-                [
-                    f'                    <div class="publication-title">{html.escape(title)}</div>',
-                    f'                    <div class="publication-authors">{authors}</div>',
-                ]
+
+def _merge_sources(sources):
+    """
+    Concatenate the (sort_key, key, entry) tuples of several files without duplicates.
+
+    An entry is dropped if an earlier one (by source, then file order) has the
+    same citation key, DOI, or title, year and first author's last name, all
+    compared case-, accent- and markup-insensitively. Earlier sources therefore
+    take precedence. Identities of dropped entries are indexed too, so
+    duplicates are found transitively, in one pass over a hash index.
+
+    Returns:
+        (merged tuples, number of duplicates dropped)
+    """
+    seen = set()
+    merged = []
+    duplicates = 0
+    for keyed_entries in sources:
+        for keyed in keyed_entries:
+            identities = _entry_identities(*keyed)
+            if any(identity in seen for identity in identities):
+                duplicates += 1
+            else:
+                merged.append(keyed)
+            seen.update(identities)
+    return merged, duplicates
+
+
+def _parse_files(paths, jobs=1):
+    """Parse BibTeX files into (sort_key, key, entry) tuples, in a process pool if jobs > 1"""
+    jobs = min(jobs, len(paths))
+    if jobs <= 1:
+        return [_parse_keyed_entries(path) for path in paths]
+
+    from concurrent.futures import ProcessPoolExecutor
+
+    with stage("parse_file"):
+        with ProcessPoolExecutor(max_workers=jobs) as executor:
+            return list(executor.map(_parse_keyed_entries, paths))
+
+
+def _load_sources(sources, cache_dir=None, jobs=1):
+    """
+    Load and merge BibTeX files and directories, see _merge_sources.
+
+    Files are checked against their snapshots first; the rest are parsed
+    concurrently with up to jobs processes.
+    """
+    files = _bibtex_files(sources)
+    loaded = [None] * len(files)
+    file_stats = [None] * len(files)
+    if cache_dir is not None:
+        for index, path in enumerate(files):
+            file_stats[index] = os.stat(path)
+            loaded[index] = _snapshot_entries(path, cache_dir, file_stats[index])
+
+    pending = [
+        index for index, keyed_entries in enumerate(loaded) if keyed_entries is None
+    ]
+    parsed = _parse_files([files[index] for index in pending], jobs)
+    for index, keyed_entries in zip(pending, parsed):
+        loaded[index] = keyed_entries
+        if cache_dir is not None:
+            _store_snapshot(files[index], cache_dir, file_stats[index], keyed_entries)
+
+    with stage("merge"):
+        merged, duplicates = _merge_sources(loaded)
+    _merge_stats.update(
+        files=len(files), entries=sum(map(len, loaded)), duplicates=duplicates
+    )
+    return merged
+
+
+def _reset_build_stats():
+    """
+    Reset the counters reported by --verbose before a build.
+
+    The daemon runs many builds in one process; the name cache and snapshots stay
+    resident between them, but each build reports only its own lookups and merge.
+    """
+    _name_cache_stats.update(hits=0, misses=0)
+    _merge_stats.clear()
+
+
+def _merge_report():
+    """Summarize the merge of the current build for verbose output, or None if there was none"""
+    if not _merge_stats:
+        return None
+    return (
+        f"Merged {_merge_stats['entries']} entries from {_merge_stats['files']} "
+        f"BibTeX files, {_merge_stats['duplicates']} duplicates removed"
+    )
+
+
+def _load_plugin_cache(cache_path):
+    """Load resolved plugin locations, returning an empty cache if missing, unreadable or outdated"""
+    try:
+        with open(cache_path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        if data.get("version") == _PLUGIN_CACHE_VERSION:
+            return data.get("plugins", {})
+    except (OSError, ValueError, AttributeError):
+        pass
+    return {}
+
+
+def _save_plugin_cache(cache_path, plugins):
+    """Write resolved plugin locations atomically"""
+    try:
+        _write_atomically(
+            cache_path,
+            lambda f: json.dump(
+                {"version": _PLUGIN_CACHE_VERSION, "plugins": plugins}, f
+            ),
+            mode="w",
+            encoding="utf-8",
+        )
+    except OSError as e:
+        print(f"Warning: could not write plugin cache: {e}", file=sys.stderr)
+
+
+def _import_cached_plugin(record):
+    """Import a plugin class from its cached location, or return None if the record is stale"""
+    try:
+        # A reinstalled or upgraded package changes the module's mtime
+        if os.stat(record["file"]).st_mtime_ns != record["mtime_ns"]:
+            return None
+        plugin = importlib.import_module(record["module"])
+        for name in record["qualname"].split("."):
+            plugin = getattr(plugin, name)
+        return plugin
+    except (OSError, ImportError, AttributeError, KeyError, TypeError):
+        return None
+
+
+def _find_plugin(group, name, cache_dir=None):
+    """
+    Resolve a pybtex plugin class, like pybtex.plugin.find_plugin.
+
+    find_plugin scans the entry points of every installed distribution, so the
+    resolved module and class are recorded in cache_dir and imported directly
+    on later runs, as long as the module file is unchanged.
+    """
+    plugin = _plugins.get((group, name))
+    if plugin is not None:
+        return plugin
+
+    cache_path = Path(cache_dir) / "plugins.json" if cache_dir is not None else None
+    records = _load_plugin_cache(cache_path) if cache_path is not None else {}
+    slot = f"{group}:{name}"
+    plugin = _import_cached_plugin(records[slot]) if slot in records else None
+    if plugin is None:
+        from pybtex.plugin import find_plugin
+
+        plugin = find_plugin(group, name)
+        module_file = getattr(sys.modules.get(plugin.__module__), "__file__", None)
+        if cache_path is not None and module_file:
+            records[slot] = {
+                "module": plugin.__module__,
+                "qualname": plugin.__qualname__,
+                "file": module_file,
+                "mtime_ns": os.stat(module_file).st_mtime_ns,
+            }
+            _save_plugin_cache(cache_path, records)
+
+    _plugins[(group, name)] = plugin
+    return plugin
+
+
+def _create_style_and_backend(cache_dir=None):
+    """
+    Patch and instantiate the APA7 style and plaintext backend, once per process.
+
+    cache_dir only locates the plugin cache for the first call, so cached and
+    --no-cache builds in one process share the same instances.
+    """
+    global _style_and_backend
+    if _style_and_backend is None:
+        _patch_apa7_style()
+        style = _find_plugin("pybtex.style.formatting", "apa7", cache_dir)()
+        backend = _find_plugin("pybtex.backends", "plaintext", cache_dir)()
+        _style_and_backend = (style, backend)
+    return _style_and_backend
+
+
+def _load_bibtex(bibtex_path, cache_dir=None, jobs=1):
+    """
+    Parse BibTeX and return (sort_key, key, entry) tuples with style/backend setup.
+
+    bibtex_path is a BibTeX file, or a directory or list of files and
+    directories whose entries are merged by _load_sources.
+    """
+    if isinstance(bibtex_path, (str, os.PathLike)):
+        bibtex_path = [bibtex_path]
+    with stage("load"):
+        if len(bibtex_path) == 1 and not os.path.isdir(bibtex_path[0]):
+            keyed_entries = _load_keyed_entries(bibtex_path[0], cache_dir)
+        else:
+            keyed_entries = _load_sources(bibtex_path, cache_dir, jobs)
+    if not keyed_entries:
+        return None, None, None
+
+    with stage("style"):
+        style, backend = _create_style_and_backend(cache_dir)
+    return keyed_entries, style, backend
+
+
+def _parse_and_sort_bibtex(bibtex_path, cache_dir=None):
+    """Parse BibTeX file and return sorted entries with style/backend setup"""
+    keyed_entries, style, backend = _load_bibtex(bibtex_path, cache_dir)
+    if keyed_entries is None:
+        return None, None, None
+    return _sort_newest_first(keyed_entries), style, backend
+
+
+def _select_first_author_entries(
+    sorted_entries, style, backend, author=_DEFAULT_AUTHOR, limit=None
+):
+    """Filter sorted entries to first-author publications, stopping after limit matches"""
+    with stage("select"):
+        is_first_author_publication = _first_author_filter(author, style, backend)
+        selected = (
+            (key, entry)
+            for key, entry in sorted_entries
+            if is_first_author_publication(entry)
+        )
+        return list(itertools.islice(selected, limit))
+
+
+def _entry_digest(key, entry, mode, highlight_names=_DEFAULT_HIGHLIGHT_NAMES):
+    """Hash the raw content of an entry together with everything that affects its rendering"""
+    import pybtex
+
+    payload = {
+        "version": _RENDER_CACHE_VERSION,
+        "pybtex": pybtex.__version__,
+        "style": "apa7",
+        "mode": mode,
+        "highlight": list(highlight_names),
+        "key": key,
+        "type": entry.type,
+        "fields": sorted((name.lower(), value) for name, value in entry.fields.items()),
+        "persons": sorted(
+            (role, [str(person) for person in persons])
+            for role, persons in entry.persons.items()
+        ),
+    }
+    encoded = json.dumps(payload, ensure_ascii=False, sort_keys=True).encode("utf-8")
+    return hashlib.sha256(encoded).hexdigest()
+
+
+def _load_render_cache(cache_path):
+    """Load cached HTML fragments, returning an empty cache if missing, unreadable or outdated"""
+    try:
+        stat = os.stat(cache_path)
+        # Reuse the resident copy unless another process rewrote the file
+        resident = _resident_render_caches.get(cache_path)
+        if resident and resident[0] == (stat.st_size, stat.st_mtime_ns):
+            return resident[1]
+        with open(cache_path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        if data.get("version") == _RENDER_CACHE_VERSION:
+            entries = data.get("entries", {})
+            _resident_render_caches[cache_path] = (
+                (stat.st_size, stat.st_mtime_ns),
+                entries,
             )
+            return entries
+    except (OSError, ValueError, AttributeError):
+        pass
+    return {}
 
-            if link_url:
-                parts.append(
-                    f'                    <a href="{html.escape(link_url)}" target="_blank" rel="noopener noreferrer" class="publication-link">{html.escape(link_text)}<svg xmlns="http://www.w3.org/2000/svg" width="24" height="24" viewBox="0 0 24 24" fill="none" stroke="currentColor" stroke-width="2" stroke-linecap="round" stroke-linejoin="round" class="lucide lucide-external-link ml-0.5 inline-block h-4 w-4" aria-hidden="true"><path d="M15 3h6v6"></path><path d="M10 14 21 3"></path><path d="M18 13v6a2 2 0 0 1-2 2H5a2 2 0 0 1-2-2V8a2 2 0 0 1 2-2h6"></path></svg></a>'
-                )
 
-            parts.append("                </div>")
-            html_parts.append("\n".join(parts))
+def _save_render_cache(cache_path, entries):
+    """Write cached HTML fragments atomically so an interrupted run cannot corrupt the cache"""
+    cache_path = Path(cache_path)
+    try:
+        _write_atomically(
+            cache_path,
+            lambda f: json.dump(
+                {"version": _RENDER_CACHE_VERSION, "entries": entries}, f
+            ),
+            mode="w",
+            encoding="utf-8",
+        )
+        stat = os.stat(cache_path)
+        _resident_render_caches[cache_path] = (
+            (stat.st_size, stat.st_mtime_ns),
+            entries,
+        )
+    except OSError as e:
+        print(f"Warning: could not write render cache: {e}", file=sys.stderr)
 
-        return "\n".join(html_parts)
 
-    except Exception as e:
-        return _handle_parse_error(e)
+# Per-process rendering state, set up once by _init_render_worker
+_worker_state = None
+
+
+def _init_render_worker(mode, bib_data, highlight_names, profile_stages=False):
+    """Set up style and backend in a worker process"""
+    global _worker_state
+    style, backend = _create_style_and_backend()
+    _worker_state = (
+        _ENTRY_RENDERERS[mode],
+        style,
+        backend,
+        bib_data,
+        highlight_names,
+        profile_stages,
+    )
+
+
+def _render_timed(render_entry, entries, style, backend, bib_data, highlight_names):
+    """Render entries, returning fragments and per-entry (key, seconds, blocks) timings"""
+    fragments = []
+    timings = []
+    for key, entry in entries:
+        blocks = sys.getallocatedblocks()
+        start = time.perf_counter()
+        with stage("normalize"):
+            publication = _Publication(key, entry, style, backend, bib_data)
+        fragments.append(
+            render_entry(publication, style, backend, bib_data, highlight_names)
+        )
+        timings.append(
+            (key, time.perf_counter() - start, sys.getallocatedblocks() - blocks)
+        )
+    return fragments, timings
+
+
+def _render_chunk(entries):
+    """
+    Render a chunk of entries in a worker.
+
+    Returns the fragments, per-entry timings, name cache counters and, if the
+    parent is profiling, the stage totals measured in the worker.
+    """
+    render_entry, style, backend, bib_data, highlight_names, profile_stages = (
+        _worker_state
+    )
+    hits, misses = _name_cache_stats["hits"], _name_cache_stats["misses"]
+    # A forked worker inherits a copy of the parent's active profile, whose
+    # measurements would be lost, so stages are collected into a fresh one
+    profile = BuildProfile() if profile_stages else None
+    with profiling(profile):
+        fragments, timings = _render_timed(
+            render_entry, entries, style, backend, bib_data, highlight_names
+        )
+    return (
+        fragments,
+        timings,
+        _name_cache_stats["hits"] - hits,
+        _name_cache_stats["misses"] - misses,
+        profile.stages if profile is not None else {},
+    )
+
+
+def _render_entry_batch(
+    entries,
+    mode,
+    style,
+    backend,
+    bib_data,
+    jobs=1,
+    highlight_names=_DEFAULT_HIGHLIGHT_NAMES,
+):
+    """Render entries in order, fanning out to a process pool for large batches"""
+    jobs = min(jobs, len(entries) // _MIN_ENTRIES_PER_JOB)
+    if jobs <= 1:
+        fragments, timings = _render_timed(
+            _ENTRY_RENDERERS[mode], entries, style, backend, bib_data, highlight_names
+        )
+        for key, seconds, blocks in timings:
+            record_entry(mode, key, seconds, blocks)
+        return fragments
+
+    from concurrent.futures import ProcessPoolExecutor
+
+    # A few chunks per worker balances uneven entries (e.g. consortium papers)
+    # while keeping pickling overhead low; map() returns chunks in order, so the
+    # output is identical to a serial run
+    chunk_size = -(-len(entries) // (jobs * 4))
+    chunks = [entries[i : i + chunk_size] for i in range(0, len(entries), chunk_size)]
+    fragments = []
+    with ProcessPoolExecutor(
+        max_workers=jobs,
+        initializer=_init_render_worker,
+        initargs=(mode, bib_data, highlight_names, is_profiling()),
+    ) as executor:
+        for chunk_fragments, timings, hits, misses, stages in executor.map(
+            _render_chunk, chunks
+        ):
+            fragments.extend(chunk_fragments)
+            for key, seconds, blocks in timings:
+                record_entry(mode, key, seconds, blocks)
+            record_stages(stages)
+            _name_cache_stats["hits"] += hits
+            _name_cache_stats["misses"] += misses
+    return fragments
+
+
+def _iter_rendered_entries(
+    sorted_entries,
+    mode,
+    style,
+    backend,
+    bib_data,
+    cache_dir=None,
+    jobs=1,
+    highlight_names=_DEFAULT_HIGHLIGHT_NAMES,
+    bibliography_keys=None,
+):
+    """
+    Yield the fragment of each entry in order, rendering lazily in chunks.
+
+    Only one chunk of fragments is held at a time, unless the render cache
+    keeps them. Cached fragments are reused for entries whose content is
+    unchanged, and the cache is saved once the generator finishes or is closed.
+    If bibliography_keys, the citation keys of the whole bibliography, is
+    given, cached fragments of any other key are dropped before saving, so
+    entries removed from the BibTeX file do not accumulate in the cache.
+    """
+    cache_path = None if cache_dir is None else Path(cache_dir) / "render_cache.json"
+    cache = None if cache_path is None else _load_render_cache(cache_path)
+    cache_changed = False
+    # Each chunk with pending entries starts its own process pool, so chunks
+    # grow with the number of jobs
+    chunk_size = _STREAM_CHUNK_SIZE * max(jobs, 1)
+    try:
+        for chunk_start in range(0, len(sorted_entries), chunk_size):
+            chunk = sorted_entries[chunk_start : chunk_start + chunk_size]
+            with stage(f"render:{mode}"):
+                # Cache slots are keyed by mode and citation key, so an edited
+                # entry replaces its previous fragment instead of accumulating
+                # stale ones
+                html_parts = [None] * len(chunk)
+                pending = []
+                for index, (key, entry) in enumerate(chunk):
+                    slot = digest = None
+                    if cache is not None:
+                        slot = f"{mode}:{key}"
+                        digest = _entry_digest(key, entry, mode, highlight_names)
+                        cached = cache.get(slot)
+                        if cached and cached.get("digest") == digest:
+                            html_parts[index] = cached["html"]
+                            continue
+                    pending.append((index, slot, digest))
+
+                if pending:
+                    fragments = _render_entry_batch(
+                        [chunk[index] for index, _, _ in pending],
+                        mode,
+                        style,
+                        backend,
+                        bib_data,
+                        jobs,
+                        highlight_names,
+                    )
+                    for (index, slot, digest), fragment in zip(pending, fragments):
+                        html_parts[index] = fragment
+                        if cache is not None:
+                            cache[slot] = {"digest": digest, "html": fragment}
+                            cache_changed = True
+            yield from html_parts
+    finally:
+        if cache is not None and bibliography_keys is not None:
+            # Slots are "mode:key"; modes contain no colon, keys may
+            removed = [
+                slot
+                for slot in cache
+                if slot.partition(":")[2] not in bibliography_keys
+            ]
+            for slot in removed:
+                del cache[slot]
+            cache_changed = cache_changed or bool(removed)
+        if cache_changed:
+            _save_render_cache(cache_path, cache)
+
+
+def _render_entries(
+    sorted_entries,
+    mode,
+    style,
+    backend,
+    bib_data,
+    cache_dir=None,
+    jobs=1,
+    highlight_names=_DEFAULT_HIGHLIGHT_NAMES,
+    bibliography_keys=None,
+):
+    """Render entries in order, reusing cached fragments for entries whose content is unchanged"""
+    return list(
+        _iter_rendered_entries(
+            sorted_entries,
+            mode,
+            style,
+            backend,
+            bib_data,
+            cache_dir,
+            jobs,
+            highlight_names,
+            bibliography_keys,
+        )
+    )
+
+
+def _render_card_entry(publication, style, backend, bib_data, highlight_names):
+    """Render a single publication as a card"""
+    title = publication.title
+    journal = publication.journal
+    year = publication.year_label
+    link_url, link_text = publication.link_url, publication.link_text
+    authors = _format_authors(publication, highlight_names)
+
+    # Build HTML structure
+    parts = ['                <div class="publication-card">']
+
+    journal_display = _format_journal_display(journal, year)
+    if journal_display:
+        parts.append(
+            f'                    <div class="publication-journal">{html.escape(journal_display)}</div>'
+        )
+
+    parts.extend(
+        [
+            f'                    <div class="publication-title">{html.escape(title)}</div>',
+            f'                    <div class="publication-authors">{authors}</div>',
+        ]
+    )
+
+    if link_url:
+        parts.append(
+            f'                    <a href="{html.escape(link_url)}" target="_blank" rel="noopener noreferrer" class="publication-link">{html.escape(link_text)}<svg xmlns="http://www.w3.org/2000/svg" width="24" height="24" viewBox="0 0 24 24" fill="none" stroke="currentColor" stroke-width="2" stroke-linecap="round" stroke-linejoin="round" class="lucide lucide-external-link ml-0.5 inline-block h-4 w-4" aria-hidden="true"><path d="M15 3h6v6"></path><path d="M10 14 21 3"></path><path d="M18 13v6a2 2 0 0 1-2 2H5a2 2 0 0 1-2-2V8a2 2 0 0 1 2-2h6"></path></svg></a>'
+        )
+
+    parts.append("                </div>")
+    return "\n".join(parts)
+
+
+def parse_bibtex_card_mode(bibtex_path, selected_only=False, cache_dir=None, jobs=1):
+    """Parse BibTeX file and return formatted HTML in card mode with visual prioritization"""
+    target = ("card", selected_only)
+    return build_publications(bibtex_path, [target], cache_dir, jobs)[target]
 
 
 def _handle_parse_error(e):
@@ -524,85 +1453,755 @@ def _handle_parse_error(e):
     return f"<p>Error loading publications: {e}</p>"
 
 
-def parse_bibtex(bibtex_path, selected_only=False):
+def _render_citation_entry(publication, style, backend, bib_data, highlight_names):
+    """Render a single publication as an APA-style citation block"""
+    # Format individual entry with bibliography context
+    with stage("format_entry"):
+        formatted_entry = style.format_entry(
+            publication.key, publication.entry, bib_data=bib_data
+        )
+        citation_str = str(formatted_entry.text.render(backend))
+
+    # Check if entry has a DOI that's not in the formatted citation
+    if publication.doi and "doi:" not in citation_str.lower():
+        citation_str += f" doi:{publication.doi}"
+
+    # Post-process to add clickable DOI links and bold author name
+    with stage("citation_postprocess"):
+        citation_html = _process_citation_html(
+            citation_str, publication, highlight_names
+        )
+
+    return f"""                <div class="publication">
+                    <div class="publication-citation">{citation_html}</div>
+                </div>
+"""
+
+
+# Per-entry renderers by output mode, looked up by name so worker processes can use them
+_ENTRY_RENDERERS = {
+    "card": _render_card_entry,
+    "citation": _render_citation_entry,
+}
+
+
+def parse_bibtex(bibtex_path, selected_only=False, cache_dir=None, jobs=1):
     """Parse BibTeX file and return formatted HTML in APA style"""
+    target = ("citation", selected_only)
+    return build_publications(bibtex_path, [target], cache_dir, jobs)[target]
+
+
+def _publication_scopes(
+    keyed_entries, style, backend, needed_scopes, author, limit, since, until
+):
+    """Map each needed scope (selected_only) to its shown (key, entry) pairs, newest first"""
+    # Entries outside the year window or past the limit are never formatted
+    if since is not None or until is not None:
+        keyed_entries = [
+            keyed for keyed in keyed_entries if _in_year_window(keyed[0], since, until)
+        ]
+
+    scopes = {}
+    if limit is None:
+        sorted_entries = _sort_newest_first(keyed_entries)
+        scopes[False] = sorted_entries
+        if True in needed_scopes:
+            scopes[True] = _select_first_author_entries(
+                sorted_entries, style, backend, author
+            )
+    else:
+        # Only the newest entries are ordered, via a heap instead of a full sort
+        if False in needed_scopes:
+            with stage("sort"):
+                scopes[False] = list(
+                    itertools.islice(_iter_newest_first(keyed_entries), limit)
+                )
+        if True in needed_scopes:
+            scopes[True] = _select_first_author_entries(
+                _iter_newest_first(keyed_entries), style, backend, author, limit
+            )
+    return scopes
+
+
+def build_publications(
+    bibtex_path,
+    targets,
+    cache_dir=None,
+    jobs=1,
+    author=_DEFAULT_AUTHOR,
+    limit=None,
+    since=None,
+    until=None,
+    highlight=None,
+):
+    """
+    Parse BibTeX file once and return formatted HTML for several outputs.
+
+    Takes the same arguments as build_publication_fragments.
+
+    Returns:
+        Dict mapping each (mode, selected_only) target to its publications HTML
+    """
+    fragments = build_publication_fragments(
+        bibtex_path, targets, cache_dir, jobs, author, limit, since, until, highlight
+    )
+    return {target: "\n".join(parts) for target, parts in fragments.items()}
+
+
+def build_publication_fragments(
+    bibtex_path,
+    targets,
+    cache_dir=None,
+    jobs=1,
+    author=_DEFAULT_AUTHOR,
+    limit=None,
+    since=None,
+    until=None,
+    highlight=None,
+):
+    """
+    Parse BibTeX file once and return the HTML fragment of each publication for several outputs.
+
+    Args:
+        bibtex_path: Path to the BibTeX file, or a directory or list of files and
+            directories merged without duplicates (see _merge_sources)
+        targets: Iterable of (mode, selected_only) tuples, mode being "card" or "citation"
+        cache_dir: Directory for the parse snapshot and render cache (default: no caching)
+        jobs: Number of processes used to render entries (default: 1)
+        author: Author whose first-author publications are selected, as "Last, First M."
+        limit: Show only the most recent N publications of each list (default: all)
+        since: Show only publications from this year on (default: no lower bound)
+        until: Show only publications up to this year (default: no upper bound)
+        highlight: Authors to bold, as "Last, First M." strings (default: [author])
+
+    Returns:
+        Dict mapping each (mode, selected_only) target to its list of HTML fragments,
+        newest first
+    """
+    targets = list(dict.fromkeys(targets))
     try:
-        sorted_entries, style, backend, sorted_bib_data = _parse_and_sort_bibtex(
-            bibtex_path, selected_only
+        keyed_entries, style, backend = _load_bibtex(bibtex_path, cache_dir, jobs)
+        if keyed_entries is None:
+            return {target: ["<p>No publications found.</p>"] for target in targets}
+
+        highlight_names = _highlight_names(
+            [author] if highlight is None else highlight, style, backend
         )
-        if sorted_entries is None:
-            return "<p>No publications found.</p>"
-
-        html_parts = []
-        for key, entry in sorted_entries:
-            # Format individual entry with bibliography context
-            formatted_entry = style.format_entry(key, entry, bib_data=sorted_bib_data)
-            citation_str = str(formatted_entry.text.render(backend))
-
-            # Check if entry has a DOI that's not in the formatted citation
-            doi_field = entry.fields.get("doi", "")
-            if doi_field and "doi:" not in citation_str.lower():
-                citation_str += f" doi:{doi_field}"
-
-            # Get number of shared first authors from usera field
-            usera_count = 0
-            try:
-                usera_field = entry.fields.get("usera", "").strip()
-                if usera_field:
-                    usera_count = int(usera_field)
-            except (ValueError, AttributeError):
-                usera_count = 0
-
-            # Post-process to add clickable DOI links and bold author name
-            citation_html = _process_citation_html(
-                citation_str, entry, style, backend, sorted_bib_data, usera_count
+        scopes = _publication_scopes(
+            keyed_entries,
+            style,
+            backend,
+            {selected_only for _, selected_only in targets},
+            author,
+            limit,
+            since,
+            until,
+        )
+
+        # Render cache entries of keys outside the bibliography are pruned
+        bibliography_keys = {key for _, key, _ in keyed_entries}
+        results = {}
+        for mode in dict.fromkeys(mode for mode, _ in targets):
+            # Each entry is rendered at most once per mode and shared between both
+            # lists; without a limit the selected entries are a subset of all entries
+            mode_scopes = [selected_only for m, selected_only in targets if m == mode]
+            render_scope = list(
+                dict(
+                    item
+                    for selected_only in mode_scopes
+                    for item in scopes[selected_only]
+                ).items()
             )
+            from pybtex.database import BibliographyData
+
+            html_parts = _render_entries(
+                render_scope,
+                mode,
+                style,
+                backend,
+                BibliographyData(dict(render_scope)),
+                cache_dir,
+                jobs,
+                highlight_names,
+                bibliography_keys,
+            )
+            fragments = dict(zip((key for key, _ in render_scope), html_parts))
+            for selected_only in mode_scopes:
+                results[(mode, selected_only)] = [
+                    fragments[key] for key, _ in scopes[selected_only]
+                ]
 
-            html_parts.append(f"""                <div class="publication">
-                    <div class="publication-citation">{citation_html}</div>
-                </div>
-""")
+        return results
 
-        return "\n".join(html_parts)
+    except Exception as e:
+        error_html = _handle_parse_error(e)
+        return {target: [error_html] for target in targets}
+
+
+def iter_publication_fragments(
+    bibtex_path,
+    target,
+    cache_dir=None,
+    jobs=1,
+    author=_DEFAULT_AUTHOR,
+    limit=None,
+    since=None,
+    until=None,
+    highlight=None,
+):
+    """
+    Yield the HTML fragment of each publication of one output, newest first.
 
+    Takes the same arguments as build_publication_fragments, but a single
+    (mode, selected_only) target. Entries are rendered in chunks as the
+    fragments are consumed, so writing them out with write_target_stream never
+    holds the whole publications HTML. An error while rendering yields an
+    error message after the fragments rendered so far.
+    """
+    mode, selected_only = target
+    try:
+        keyed_entries, style, backend = _load_bibtex(bibtex_path, cache_dir, jobs)
+        if keyed_entries is None:
+            yield "<p>No publications found.</p>"
+            return
+
+        highlight_names = _highlight_names(
+            [author] if highlight is None else highlight, style, backend
+        )
+        entries = _publication_scopes(
+            keyed_entries,
+            style,
+            backend,
+            {selected_only},
+            author,
+            limit,
+            since,
+            until,
+        )[selected_only]
+        from pybtex.database import BibliographyData
+
+        fragments = _iter_rendered_entries(
+            entries,
+            mode,
+            style,
+            backend,
+            BibliographyData(dict(entries)),
+            cache_dir,
+            jobs,
+            highlight_names,
+            {key for _, key, _ in keyed_entries},
+        )
+        yield from fragments
     except Exception as e:
-        return _handle_parse_error(e)
+        yield _handle_parse_error(e)
+
+
+def _search_tokens(text):
+    """Split text into lowercase, accent-free search terms of at least two characters"""
+    # Must match tokenize() in search.js
+    decomposed = unicodedata.normalize("NFKD", text)
+    plain = "".join(char for char in decomposed if not unicodedata.combining(char))
+    return [
+        token for token in _SEARCH_TOKEN_SPLIT.split(plain.lower()) if len(token) > 1
+    ]
+
+
+def _encode_search_index(documents):
+    """Build the inverted index for a list of searchable texts, IDs being list positions"""
+    postings = {}
+    for doc_id, text in enumerate(documents):
+        for term in set(_search_tokens(text)):
+            postings.setdefault(term, []).append(doc_id)
+
+    # Terms are sorted so the loader can find every term with a prefix by binary
+    # search; IDs are ascending, so storing gaps keeps the numbers (and JSON) small
+    terms = sorted(postings)
+    return {
+        "version": _SEARCH_INDEX_VERSION,
+        "count": len(documents),
+        "terms": terms,
+        "postings": [
+            [doc_id - previous for previous, doc_id in zip([0] + ids, ids)]
+            for ids in (postings[term] for term in terms)
+        ],
+    }
 
 
-def inject_html(html_path, publications_html):
-    """Inject publications HTML into index.html"""
+def build_search_index(
+    bibtex_path,
+    target,
+    cache_dir=None,
+    author=_DEFAULT_AUTHOR,
+    limit=None,
+    since=None,
+    until=None,
+):
+    """
+    Build the client-side search index for the publications shown by a target.
+
+    Takes the same selection arguments as build_publication_fragments. Document
+    IDs are positions in the target's list, so they match the order of the
+    rendered publications on the page.
+
+    Returns:
+        Dict with the sorted "terms" and their delta-encoded "postings"
+    """
+    keyed_entries, style, backend = _load_bibtex(bibtex_path, cache_dir)
+    if keyed_entries is None:
+        return _encode_search_index([])
+
+    _, selected_only = target
+    scopes = _publication_scopes(
+        keyed_entries, style, backend, {selected_only}, author, limit, since, until
+    )
+    from pybtex.database import BibliographyData
+
+    with stage("search_index"):
+        bib_data = BibliographyData(dict(scopes[selected_only]))
+        documents = []
+        for key, entry in scopes[selected_only]:
+            publication = _Publication(key, entry, style, backend, bib_data)
+            documents.append(
+                " ".join(
+                    (
+                        publication.title,
+                        " ".join(publication.authors or ()),
+                        publication.journal,
+                        publication.year_label,
+                    )
+                )
+            )
+        return _encode_search_index(documents)
+
+
+def write_search_index(path, search_index):
+    """Write a search index as compact JSON, skipping the write if unchanged"""
     try:
-        with open(html_path, "r", encoding="utf-8") as f:
-            content = f.read()
+        written = _write_if_changed(
+            path, json.dumps(search_index, ensure_ascii=False, separators=(",", ":"))
+        )
+    except OSError as e:
+        print(f"Error writing search index {path}: {e}", file=sys.stderr)
+        sys.exit(1)
+    if written:
+        print(f"Successfully wrote search index to {path}")
+    else:
+        print(f"Search index {path} is up to date")
 
-        # Find the publications section and replace content between <h2> and </section>
-        # Match any h2 heading (e.g., "Publications" or "Selected Publications")
-        pattern = r'(<section id="publications">\s*<h2>[^<]*</h2>)(.*?)(</section>)'
 
-        # Check if any publications have superscript asterisks (indicating shared first authorship)
-        has_shared_authorship = "<sup>*</sup>" in publications_html
+def _publication_note_html(publications_html):
+    """Equal contribution note, added if any publication has shared first authors"""
+    # Check if any publications have superscript asterisks (indicating shared first authorship)
+    if _SHARED_FIRST_AUTHOR_MARK in publications_html:
+        return _EQUAL_CONTRIBUTION_NOTE
+    return ""
 
-        # Add equal contribution note if there are shared first authors
-        if has_shared_authorship:
-            note_html = '\n            <p class="publication-note" style="font-size: 0.9em; text-align: right;"><strong>*</strong> indicates equal contribution</p>'
-        else:
-            note_html = ""
 
-        replacement = f"\\1\n{publications_html}{note_html}            \\3"
+def _find_publications_region(content):
+    """
+    Locate the body of the publications section, after its <h2> heading, as (start, end) offsets.
+
+    content may be a str, or bytes-like with find() and slicing such as an mmap.
+    """
+    if isinstance(content, str):
+        section_start, heading_open, heading_close = _SECTION_START, "<h2>", "</h2>"
+        section_end, tag_open = _SECTION_END, "<"
+    else:
+        section_start = _SECTION_START.encode("utf-8")
+        heading_open, heading_close = b"<h2>", b"</h2>"
+        section_end, tag_open = _SECTION_END.encode("utf-8"), b"<"
+
+    section = content.find(section_start)
+    if section == -1:
+        return None
+
+    heading = section + len(section_start)
+    while heading < len(content) and content[heading : heading + 1].isspace():
+        heading += 1
+    if content[heading : heading + len(heading_open)] != heading_open:
+        return None
+
+    # Any h2 heading text (e.g., "Publications" or "Selected Publications")
+    heading_end = content.find(heading_close, heading)
+    if (
+        heading_end == -1
+        or tag_open in content[heading + len(heading_open) : heading_end]
+    ):
+        return None
+
+    start = heading_end + len(heading_close)
+    end = content.find(section_end, start)
+    if end == -1:
+        return None
+    return start, end
+
+
+def _splice_publications(content, publications_html, note_html):
+    """Replace the publications section body of a page, or return None if it has none"""
+    region = _find_publications_region(content)
+    if region is None:
+        return None
+    start, end = region
+    return "".join(
+        (
+            content[:start],
+            "\n",
+            publications_html,
+            note_html,
+            "            ",
+            content[end:],
+        )
+    )
+
 
-        new_content = re.sub(pattern, replacement, content, flags=re.DOTALL)
+def _write_if_changed(path, content, current=None):
+    """Atomically replace path with content unless it already holds the same bytes"""
+    path = Path(path)
+    data = content.encode("utf-8")
+    if current is None:
+        try:
+            current = path.read_bytes()
+        except FileNotFoundError:
+            pass
+    if current == data:
+        return False
+
+    # Write next to the target and rename over it, so readers (the dev server,
+    # a deploy upload) never see a half-written page
+    return _write_atomically(path, lambda f: f.write(data))
 
-        with open(html_path, "w", encoding="utf-8") as f:
-            f.write(new_content)
 
+def _inject_content(html_path, current, publications_html, note_html):
+    """Splice publications into the page bytes read from html_path and write it if changed"""
+    new_content = _splice_publications(
+        current.decode("utf-8"), publications_html, note_html
+    )
+    if new_content is None:
+        raise ValueError(
+            f'no <section id="publications"> with an <h2> heading in {html_path}'
+        )
+
+    if _write_if_changed(html_path, new_content, current):
         print(f"Successfully injected publications into {html_path}")
+    else:
+        print(f"Publications in {html_path} are up to date")
+
 
+def inject_html(html_path, publications_html):
+    """Inject publications HTML into the publications section of a page"""
+    try:
+        with stage("inject"):
+            _inject_content(
+                html_path,
+                Path(html_path).read_bytes(),
+                publications_html,
+                _publication_note_html(publications_html),
+            )
     except Exception as e:
         print(f"Error injecting HTML: {e}", file=sys.stderr)
         sys.exit(1)
 
 
-def main():
+def _remove_stale_fragments(path, fragment_pages=0):
+    """Delete numbered fragments of the page at path beyond fragment_pages, left by an earlier build"""
+    pattern = f"publications/{glob.escape(path.stem)}-*.html"
+    try:
+        for stale in path.parent.glob(pattern):
+            page = stale.stem[len(path.stem) + 1 :]
+            if page.isdigit() and int(page) > fragment_pages:
+                stale.unlink()
+    except OSError as e:
+        print(f"Error removing publication fragments for {path}: {e}", file=sys.stderr)
+        sys.exit(1)
+
+
+def _has_publications_section(path):
+    """Whether the file at path contains a publications section"""
+    try:
+        return _SECTION_START.encode("utf-8") in Path(path).read_bytes()
+    except OSError:
+        return False
+
+
+def _missing_section_error(path):
+    """Exit with an error for a page that must be injected into but has no publications section"""
+    print(
+        f'Error injecting HTML: no <section id="publications"> in {path}',
+        file=sys.stderr,
+    )
+    sys.exit(1)
+
+
+def write_target(
+    path, publications_html, note_html=None, fragment_pages=0, inject_only=False
+):
+    """
+    Inject publications into a page with a publications section, or write them as a fragment.
+
+    Numbered fragments of the page beyond fragment_pages, written by an earlier
+    build with more pages or with --page-size, are removed. With inject_only, a
+    path without a publications section is an error instead of a fragment target.
+    """
+    path = Path(path)
+    if note_html is None:
+        note_html = _publication_note_html(publications_html)
+    try:
+        current = path.read_bytes()
+    except FileNotFoundError:
+        current = None
+    except OSError as e:
+        print(f"Error reading {path}: {e}", file=sys.stderr)
+        sys.exit(1)
+
+    has_section = current is not None and _SECTION_START.encode("utf-8") in current
+    if inject_only and not has_section:
+        _missing_section_error(path)
+    _remove_stale_fragments(path, fragment_pages)
+
+    if has_section:
+        try:
+            with stage("inject"):
+                _inject_content(path, current, publications_html, note_html)
+        except Exception as e:
+            print(f"Error injecting HTML: {e}", file=sys.stderr)
+            sys.exit(1)
+        return
+
+    try:
+        with stage("inject"):
+            written = _write_if_changed(
+                path,
+                publications_html + note_html,
+                current,
+            )
+        if written:
+            print(f"Successfully wrote publications to {path}")
+        else:
+            print(f"Publications in {path} are up to date")
+    except OSError as e:
+        print(f"Error writing {path}: {e}", file=sys.stderr)
+        sys.exit(1)
+
+
+def _stream_publications(out, fragments, page=None, region=None):
+    """Write page around the joined fragments and the note to out, fragment by fragment"""
+    if region is not None:
+        out.write(page[: region[0]])
+        out.write(b"\n")
+    shared_first_authors = False
+    for index, fragment in enumerate(fragments):
+        if index:
+            out.write(b"\n")
+        out.write(fragment.encode("utf-8"))
+        if not shared_first_authors:
+            shared_first_authors = _SHARED_FIRST_AUTHOR_MARK in fragment
+    if shared_first_authors:
+        out.write(_EQUAL_CONTRIBUTION_NOTE.encode("utf-8"))
+    if region is not None:
+        out.write(b"            ")
+        out.write(page[region[1] :])
+
+
+def _stream_if_changed(path, fragments, current=None, region=None):
+    """
+    Stream the publications into a temporary file and replace path if it differs.
+
+    current is the memory-mapped content of path (or None if path does not
+    exist), and region the publications section body to replace in it (or None
+    to write the fragments alone).
+    """
+    return _write_atomically(
+        path,
+        lambda f: _stream_publications(f, fragments, current, region),
+        unless_equal=True,
+    )
+
+
+def write_target_stream(path, fragments, inject_only=False):
+    """
+    Like write_target, but streaming publication fragments straight into the file.
+
+    The page is memory-mapped and the new file is written next to it from the
+    page prefix, the fragments as they are produced and the page suffix, so
+    neither the publications HTML nor the new page is built in memory.
+    """
+    path = Path(path)
+    try:
+        current_file = open(path, "rb")
+    except FileNotFoundError:
+        current_file = None
+    except OSError as e:
+        print(f"Error reading {path}: {e}", file=sys.stderr)
+        sys.exit(1)
+
+    with contextlib.ExitStack() as stack:
+        current = None
+        if current_file is not None:
+            stack.enter_context(current_file)
+            if os.fstat(current_file.fileno()).st_size:
+                current = stack.enter_context(
+                    mmap.mmap(current_file.fileno(), 0, access=mmap.ACCESS_READ)
+                )
+            else:
+                current = b""
+
+        has_section = (
+            current is not None and current.find(_SECTION_START.encode("utf-8")) != -1
+        )
+        if inject_only and not has_section:
+            _missing_section_error(path)
+        _remove_stale_fragments(path)
+
+        if has_section:
+            try:
+                # Rendering happens while writing, so this stage includes the
+                # render stages nested in it
+                with stage("stream"):
+                    region = _find_publications_region(current)
+                    if region is None:
+                        raise ValueError(
+                            f'no <section id="publications"> with an <h2> heading in {path}'
+                        )
+                    written = _stream_if_changed(path, fragments, current, region)
+            except Exception as e:
+                print(f"Error injecting HTML: {e}", file=sys.stderr)
+                sys.exit(1)
+            if written:
+                print(f"Successfully injected publications into {path}")
+            else:
+                print(f"Publications in {path} are up to date")
+            return
+
+        try:
+            with stage("stream"):
+                written = _stream_if_changed(path, fragments, current)
+            if written:
+                print(f"Successfully wrote publications to {path}")
+            else:
+                print(f"Publications in {path} are up to date")
+        except OSError as e:
+            print(f"Error writing {path}: {e}", file=sys.stderr)
+            sys.exit(1)
+
+
+def _paged_fragment_path(path, page):
+    """Path of a numbered publications fragment loaded on scroll by the page at path"""
+    return path.parent / "publications" / f"{path.stem}-{page}.html"
+
+
+def _more_publications_html(path, pages):
+    """Placeholder and script that append the numbered fragments of a page when scrolled into view"""
+    url_prefix = html.escape(f"publications/{path.stem}-")
+    return f"""
+                <button type="button" class="publication-more" data-prefix="{url_prefix}" data-pages="{pages}">Show more publications</button>
+                <script>
+                    (function() {{
+                        const more = document.currentScript.previousElementSibling;
+                        const pages = Number(more.dataset.pages);
+                        let next = 1;
+                        let loading = false;
+                        let observer = null;
+
+                        function load() {{
+                            if (loading || next > pages) return;
+                            loading = true;
+                            fetch(more.dataset.prefix + next + '.html')
+                                .then(response => response.ok ? response.text() : Promise.reject(response.status))
+                                .then(fragment => {{
+                                    more.insertAdjacentHTML('beforebegin', fragment);
+                                    next += 1;
+                                    if (next > pages) {{
+                                        if (observer) observer.disconnect();
+                                        more.remove();
+                                    }} else if (observer) {{
+                                        // Re-observe so a placeholder still in view loads the next page
+                                        observer.unobserve(more);
+                                        observer.observe(more);
+                                    }}
+                                }})
+                                .catch(() => {{}})
+                                .finally(() => {{ loading = false; }});
+                        }}
+
+                        more.addEventListener('click', load);
+                        if ('IntersectionObserver' in window) {{
+                            observer = new IntersectionObserver(entries => {{
+                                if (entries[0].isIntersecting) load();
+                            }}, {{ rootMargin: '800px' }});
+                            observer.observe(more);
+                        }}
+                    }})();
+                </script>
+"""
+
+
+def write_paged_target(path, fragments, page_size, inject_only=False):
+    """Write the first page_size publications to a target and the rest as numbered fragments"""
+    path = Path(path)
+    if inject_only and not _has_publications_section(path):
+        # Checked up front so no fragments are written for a page that is rejected
+        _missing_section_error(path)
+
+    pages = [
+        fragments[start : start + page_size]
+        for start in range(page_size, len(fragments), page_size)
+    ]
+
+    try:
+        with stage("fragments"):
+            for page, page_fragments in enumerate(pages, 1):
+                _write_if_changed(
+                    _paged_fragment_path(path, page), "\n".join(page_fragments) + "\n"
+                )
+    except OSError as e:
+        print(f"Error writing publication fragments for {path}: {e}", file=sys.stderr)
+        sys.exit(1)
+
+    publications_html = "\n".join(fragments[:page_size])
+    if pages:
+        publications_html += _more_publications_html(path, len(pages))
+        print(f"Wrote {len(pages)} publication fragments for {path}")
+
+    # The note depends on every publication, not just the inlined first page
+    write_target(
+        path,
+        publications_html,
+        _publication_note_html("\n".join(fragments)),
+        fragment_pages=len(pages),
+        inject_only=inject_only,
+    )
+
+
+def _parse_target(spec):
+    """Parse a --target value of the form MODE:SCOPE=PATH"""
+    try:
+        selector, path = spec.split("=", 1)
+        mode, scope = selector.split(":", 1)
+    except ValueError:
+        raise argparse.ArgumentTypeError(
+            f"invalid target {spec!r}, expected MODE:SCOPE=PATH"
+        ) from None
+    if mode not in _ENTRY_RENDERERS:
+        raise argparse.ArgumentTypeError(f"invalid mode {mode!r} in target {spec!r}")
+    if scope not in ("all", "selected"):
+        raise argparse.ArgumentTypeError(
+            f"invalid scope {scope!r} in target {spec!r}, expected 'all' or 'selected'"
+        )
+    return mode, scope == "selected", Path(path)
+
+
+def _positive_int(value):
+    """Parse a positive integer command-line value"""
+    try:
+        number = int(value)
+    except ValueError:
+        number = 0
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"expected a positive integer, got {value!r}")
+    return number
+
+
+def main(argv=None):
     """Main function"""
     parser = argparse.ArgumentParser(description="Convert BibTeX to HTML")
     parser.add_argument(
@@ -616,31 +2215,261 @@ def main():
         action="store_true",
         help="Show all publications (default is to show only first-author publications)",
     )
-    args = parser.parse_args()
+    parser.add_argument(
+        "--target",
+        action="append",
+        type=_parse_target,
+        metavar="MODE:SCOPE=PATH",
+        help="Build an output in the same run, e.g. 'citation:all=publications.html' "
+        "(repeatable; SCOPE is 'all' or 'selected'). Pages with a publications "
+        "section are injected into, other paths receive the HTML fragment. "
+        "Replaces the default --mode/--all output to index.html",
+    )
+    parser.add_argument(
+        "--author",
+        default=_DEFAULT_AUTHOR,
+        help=f"Author whose first-author publications are selected, as 'Last, First M.' "
+        f"(default: {_DEFAULT_AUTHOR})",
+    )
+    parser.add_argument(
+        "--highlight",
+        action="append",
+        metavar="NAME",
+        help="Author to bold in the output, as 'Last, First M.' (repeatable; "
+        "default: the --author)",
+    )
+    parser.add_argument(
+        "--limit",
+        type=_positive_int,
+        metavar="N",
+        help="Show only the N most recent publications of each list",
+    )
+    parser.add_argument(
+        "--since",
+        type=int,
+        metavar="YEAR",
+        help="Show only publications from YEAR on",
+    )
+    parser.add_argument(
+        "--until",
+        type=int,
+        metavar="YEAR",
+        help="Show only publications up to and including YEAR",
+    )
+    parser.add_argument(
+        "--page-size",
+        type=_positive_int,
+        metavar="N",
+        help="Inline only the first N publications and write the rest as numbered "
+        "fragments in publications/, loaded on scroll",
+    )
+    parser.add_argument(
+        "--search-index",
+        type=Path,
+        metavar="PATH",
+        help="Also write a prebuilt search index (JSON) for the publications of the "
+        "first output, loaded in the browser by search.js",
+    )
+    parser.add_argument(
+        "--bibtex",
+        action="append",
+        type=Path,
+        metavar="PATH",
+        help="BibTeX file, or directory searched for .bib files (repeatable; default: "
+        "data/publications.bib). Entries are merged, dropping duplicates by citation "
+        "key, DOI, or title, year and first author; earlier sources take precedence",
+    )
+    parser.add_argument(
+        "--page",
+        action="append",
+        type=Path,
+        metavar="PATH",
+        help="Inject the --mode/--all output into this page (repeatable; default: index.html)",
+    )
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=1,
+        help="Number of processes used to render entries (default: 1, 0 for all CPUs)",
+    )
+    parser.add_argument(
+        "-v",
+        "--verbose",
+        action="store_true",
+        help="Print build statistics such as author name cache hit rates",
+    )
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="Print wall time and allocated memory blocks per stage and the slowest entries",
+    )
+    parser.add_argument(
+        "--profile-json",
+        metavar="PATH",
+        help="Write stage and entry measurements as a JSON trace (implies --profile)",
+    )
+    parser.add_argument(
+        "--cprofile",
+        metavar="PATH",
+        help="Write a cProfile dump of the build, readable with pstats (implies --profile)",
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Re-parse and re-render everything instead of reusing the parse snapshot and cached HTML",
+    )
+    parser.add_argument(
+        "--daemon",
+        action="store_true",
+        help="Keep the parsed bibliography, style and caches in memory and serve "
+        "builds requested with bibtex-to-html-client over a Unix socket",
+    )
+    parser.add_argument(
+        "--socket",
+        type=Path,
+        metavar="PATH",
+        help="Unix socket of the --daemon (default: .cache/bibtex-to-html.sock)",
+    )
+    args = parser.parse_args(argv)
 
     # Get paths relative to script location
     script_dir = Path(__file__).parent
     project_root = script_dir.parent
 
-    bibtex_path = project_root / "data" / "publications.bib"
-    html_path = project_root / "index.html"
-
-    if not bibtex_path.exists():
-        print(f"Error: BibTeX file not found at {bibtex_path}", file=sys.stderr)
-        sys.exit(1)
-
-    if not html_path.exists():
-        print(f"Error: HTML file not found at {html_path}", file=sys.stderr)
-        sys.exit(1)
+    # Relative BibTeX paths are resolved against the project root
+    bibtex_path = [
+        project_root / path
+        for path in args.bibtex or [Path("data") / "publications.bib"]
+    ]
+
+    if args.daemon:
+        from scripts.build_daemon import DEFAULT_SOCKET, serve_daemon
+
+        serve_daemon(
+            project_root / (args.socket or DEFAULT_SOCKET),
+            main,
+            # Load pybtex, the style, the parse snapshot and the render cache
+            lambda: build_publication_fragments(
+                bibtex_path,
+                [(args.mode, not args.all)],
+                None if args.no_cache else project_root / ".cache",
+            ),
+        )
+        return
 
-    # Parse BibTeX and generate HTML based on mode
-    if args.mode == "card":
-        publications_html = parse_bibtex_card_mode(bibtex_path, not args.all)
+    html_path = project_root / "index.html"
+    cache_dir = None if args.no_cache else project_root / ".cache"
+    jobs = args.jobs if args.jobs > 0 else os.cpu_count() or 1
+
+    for source in bibtex_path:
+        if not source.exists():
+            print(f"Error: BibTeX file not found at {source}", file=sys.stderr)
+            sys.exit(1)
+
+    if args.target:
+        # Relative target paths are resolved against the project root
+        targets = [
+            (mode, selected_only, project_root / path)
+            for mode, selected_only, path in args.target
+        ]
     else:
-        publications_html = parse_bibtex(bibtex_path, not args.all)
+        pages = [project_root / page for page in args.page or [html_path]]
+        for page in pages:
+            if not page.exists():
+                print(f"Error: HTML file not found at {page}", file=sys.stderr)
+                sys.exit(1)
+            if not _has_publications_section(page):
+                _missing_section_error(page)
+        targets = [(args.mode, not args.all, page) for page in pages]
+    # --page only injects into existing publications sections, while --target
+    # writes bare fragments to paths without one
+    inject_only = not args.target
+
+    _reset_build_stats()
+    profile = (
+        BuildProfile() if args.profile or args.profile_json or args.cprofile else None
+    )
+    profiler = None
+    if args.cprofile:
+        import cProfile
+
+        profiler = cProfile.Profile()
+        profiler.enable()
+
+    with profiling(profile):
+        if len(targets) == 1 and not args.page_size:
+            # A single output is streamed into its file as entries are rendered
+            mode, selected_only, path = targets[0]
+            write_target_stream(
+                path,
+                iter_publication_fragments(
+                    bibtex_path,
+                    (mode, selected_only),
+                    cache_dir,
+                    jobs,
+                    args.author,
+                    args.limit,
+                    args.since,
+                    args.until,
+                    args.highlight,
+                ),
+                inject_only=inject_only,
+            )
+        else:
+            # Parse BibTeX once and generate HTML for every requested mode/scope
+            results = build_publication_fragments(
+                bibtex_path,
+                [(mode, selected_only) for mode, selected_only, _ in targets],
+                cache_dir,
+                jobs,
+                args.author,
+                args.limit,
+                args.since,
+                args.until,
+                args.highlight,
+            )
+
+            for mode, selected_only, path in targets:
+                fragments = results[(mode, selected_only)]
+                if args.page_size:
+                    write_paged_target(
+                        path, fragments, args.page_size, inject_only=inject_only
+                    )
+                else:
+                    write_target(path, "\n".join(fragments), inject_only=inject_only)
+
+        if args.search_index:
+            mode, selected_only, _ = targets[0]
+            write_search_index(
+                project_root / args.search_index,
+                build_search_index(
+                    bibtex_path,
+                    (mode, selected_only),
+                    cache_dir,
+                    args.author,
+                    args.limit,
+                    args.since,
+                    args.until,
+                ),
+            )
 
-    # Inject into index.html
-    inject_html(html_path, publications_html)
+    if profiler is not None:
+        profiler.disable()
+        profiler.dump_stats(args.cprofile)
+        print(f"Wrote cProfile dump to {args.cprofile}")
+
+    if args.verbose:
+        print(_name_cache_report())
+        merge_report = _merge_report()
+        if merge_report:
+            print(merge_report)
+
+    if profile is not None:
+        print(profile.report())
+        if args.profile_json:
+            profile.write_json(args.profile_json)
+            print(f"Wrote profile trace to {args.profile_json}")
 
 
 if __name__ == "__main__":
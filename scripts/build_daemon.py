@@ -0,0 +1,255 @@
+#!/usr/bin/env python3
+"""
+Warm build daemon for bibtex-to-html and its thin client
+
+`bibtex-to-html --daemon` keeps pybtex, the patched APA7 style, the parsed
+bibliography snapshot, the render cache and the author name cache in memory,
+and runs builds requested over a Unix socket. `bibtex-to-html-client ARGS`
+forwards its arguments to the daemon and prints the result, so a rebuild skips
+interpreter startup, imports and style setup. Without a running daemon the
+client builds in-process.
+
+This module is imported by the client, so it must stay free of heavy imports.
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import signal
+import socket
+import sys
+import traceback
+from pathlib import Path
+
+# Unix socket of the daemon, relative to the project root
+DEFAULT_SOCKET = Path(".cache") / "bibtex-to-html.sock"
+
+_PROJECT_ROOT = Path(__file__).parent.parent
+
+# Requests larger than this are rejected
+_MAX_REQUEST_BYTES = 1 << 20
+
+
+def _source_mtimes():
+    """Modification times of the build scripts, to detect a stale daemon"""
+    return {
+        path.name: path.stat().st_mtime_ns
+        for path in Path(__file__).parent.glob("*.py")
+    }
+
+
+def _receive_all(connection, limit=None):
+    """Read from a socket until the peer shuts down its side"""
+    chunks = []
+    received = 0
+    while True:
+        chunk = connection.recv(65536)
+        if not chunk:
+            return b"".join(chunks)
+        received += len(chunk)
+        if limit is not None and received > limit:
+            raise ValueError("request too large")
+        chunks.append(chunk)
+
+
+def _run_build(run, argv, cwd):
+    """Run a build in-process, returning (status, stdout, stderr)"""
+    stdout = io.StringIO()
+    stderr = io.StringIO()
+    status = 0
+    previous_cwd = os.getcwd()
+    try:
+        os.chdir(cwd)
+        with contextlib.redirect_stdout(stdout), contextlib.redirect_stderr(stderr):
+            run(argv)
+    except SystemExit as e:
+        # argparse errors, --help and sys.exit() in main
+        if isinstance(e.code, int):
+            status = e.code
+        elif e.code is not None:
+            stderr.write(f"{e.code}\n")
+            status = 1
+    except Exception:
+        stderr.write(traceback.format_exc())
+        status = 1
+    finally:
+        os.chdir(previous_cwd)
+    return status, stdout.getvalue(), stderr.getvalue()
+
+
+def _handle_request(connection, run, started_mtimes):
+    """
+    Serve one client connection.
+
+    Returns:
+        True if the daemon should keep running
+    """
+    try:
+        request = json.loads(_receive_all(connection, _MAX_REQUEST_BYTES))
+    except (OSError, ValueError) as e:
+        response = {"status": 1, "stdout": "", "stderr": f"Invalid request: {e}\n"}
+        connection.sendall(json.dumps(response).encode("utf-8"))
+        return True
+
+    if request.get("command") == "stop":
+        connection.sendall(json.dumps({"status": 0, "stopped": True}).encode("utf-8"))
+        return False
+
+    # Code edited since startup would make the daemon's output differ from a
+    # fresh run; the client builds in-process instead
+    if _source_mtimes() != started_mtimes:
+        connection.sendall(json.dumps({"stale": True}).encode("utf-8"))
+        return False
+
+    argv = [str(arg) for arg in request.get("argv", [])]
+    if "--daemon" in argv:
+        status, stdout, stderr = 2, "", "Error: --daemon cannot be sent to a daemon\n"
+    else:
+        status, stdout, stderr = _run_build(
+            run, argv, request.get("cwd") or os.getcwd()
+        )
+    response = {"status": status, "stdout": stdout, "stderr": stderr}
+    connection.sendall(json.dumps(response).encode("utf-8"))
+    return True
+
+
+def _bind(socket_path):
+    """Listen on socket_path, replacing a stale socket file but not a live daemon"""
+    socket_path = Path(socket_path)
+    socket_path.parent.mkdir(parents=True, exist_ok=True)
+    if socket_path.exists():
+        probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            probe.connect(str(socket_path))
+        except OSError:
+            socket_path.unlink()
+        else:
+            raise OSError(f"a daemon is already listening on {socket_path}")
+        finally:
+            probe.close()
+
+    server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    server.bind(str(socket_path))
+    # Builds write into the project, so only the owner may request them
+    os.chmod(socket_path, 0o600)
+    server.listen(16)
+    return server
+
+
+def serve_daemon(socket_path, run, warm_up=None):
+    """
+    Run builds requested over a Unix socket until stopped.
+
+    Args:
+        socket_path: Path of the Unix socket to listen on
+        run: Function taking an argument list and running one build, i.e.
+            bibtex_to_html.main; its state stays warm between requests
+        warm_up: Function called once before accepting requests, e.g. a build
+            without output that loads pybtex, the style and the caches
+
+    Requests are handled one at a time, so builds never overlap. The daemon
+    exits on a stop request, SIGTERM, Ctrl+C, or when the build scripts change.
+    """
+    try:
+        server = _bind(socket_path)
+    except OSError as e:
+        print(f"Error: could not start daemon: {e}", file=sys.stderr)
+        sys.exit(1)
+
+    def terminate(signum, frame):
+        raise KeyboardInterrupt
+
+    signal.signal(signal.SIGTERM, terminate)
+    started_mtimes = _source_mtimes()
+
+    if warm_up is not None:
+        warm_up()
+    print(f"Build daemon listening on {socket_path}")
+    print("Press Ctrl+C to stop")
+
+    try:
+        running = True
+        while running:
+            connection, _ = server.accept()
+            with connection:
+                try:
+                    running = _handle_request(connection, run, started_mtimes)
+                except OSError as e:
+                    print(f"Warning: lost client connection: {e}", file=sys.stderr)
+    except KeyboardInterrupt:
+        print("\nDaemon stopped")
+    finally:
+        server.close()
+        Path(socket_path).unlink(missing_ok=True)
+
+
+def _request(socket_path, request):
+    """Send a request to the daemon and return its response, or None if none is running"""
+    client = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        client.connect(str(socket_path))
+    except (FileNotFoundError, ConnectionRefusedError):
+        client.close()
+        return None
+    with client:
+        client.sendall(json.dumps(request).encode("utf-8"))
+        client.shutdown(socket.SHUT_WR)
+        return json.loads(_receive_all(client))
+
+
+def client_main():
+    """Main function of bibtex-to-html-client"""
+    parser = argparse.ArgumentParser(
+        description="Run a bibtex-to-html build in the warm daemon "
+        "(started with bibtex-to-html --daemon), or in-process if none is running. "
+        "Other arguments are passed on to bibtex-to-html.",
+    )
+    parser.add_argument(
+        "--socket",
+        type=Path,
+        metavar="PATH",
+        help=f"Unix socket of the daemon (default: {DEFAULT_SOCKET})",
+    )
+    parser.add_argument(
+        "--stop",
+        action="store_true",
+        help="Stop the daemon",
+    )
+    args, argv = parser.parse_known_args()
+    socket_path = _PROJECT_ROOT / (args.socket or DEFAULT_SOCKET)
+
+    if args.stop:
+        response = _request(socket_path, {"command": "stop"})
+        print("Daemon stopped" if response else "No daemon running")
+        return
+
+    try:
+        response = _request(socket_path, {"argv": argv, "cwd": os.getcwd()})
+    except (OSError, ValueError) as e:
+        print(
+            f"Warning: daemon request failed ({e}), building in-process",
+            file=sys.stderr,
+        )
+        response = None
+
+    if response is None or response.get("stale"):
+        if response is not None:
+            print(
+                "Warning: build scripts changed since the daemon started, "
+                "daemon stopped; building in-process",
+                file=sys.stderr,
+            )
+        from scripts.bibtex_to_html import main
+
+        main(argv)
+        return
+
+    sys.stdout.write(response["stdout"])
+    sys.stderr.write(response["stderr"])
+    sys.exit(response["status"])
+
+
+if __name__ == "__main__":
+    client_main()
@@ -0,0 +1,533 @@
+#!/usr/bin/env python3
+"""
+Build the deployable site: minify, content-hash and precompress assets
+
+Pages keep their names and are rewritten to reference hashed assets, so the
+assets can be cached forever. A manifest in the output directory records the
+source hash and outputs of every file, so unchanged files are neither
+reprocessed nor rewritten on the next build.
+"""
+
+import argparse
+import gzip
+import hashlib
+import json
+import os
+import re
+import sys
+from pathlib import Path
+
+from scripts.bibtex_to_html import _write_atomically
+from scripts.critical_css import inline_critical_css
+from scripts.images import (
+    can_generate_variants,
+    generate_variants,
+    image_size,
+    img_sources,
+    inject_responsive_images,
+)
+
+_MANIFEST_NAME = ".build-manifest.json"
+_MANIFEST_VERSION = 3
+
+# Critical CSS per page and stylesheet, in the cache directory
+_CRITICAL_CSS_CACHE_NAME = "critical-css.json"
+
+# Entry points, copied under their own name
+_PAGES = ("index.html",)
+
+# Top-level files and directories copied into the site, if present
+_SOURCES = ("index.html", "styles.css", "search.js", "data", "publications")
+
+# Assets renamed with a content hash. Everything else keeps its name: downloads
+# (e.g. the CV), the BibTeX file, and publication fragments and the search index,
+# which are fetched by URLs built in the browser
+_HASHED_SUFFIXES = {
+    ".css",
+    ".js",
+    ".png",
+    ".jpg",
+    ".jpeg",
+    ".gif",
+    ".webp",
+    ".svg",
+    ".ico",
+}
+
+# Text formats that get a precompressed ".gz" sibling
+_COMPRESSED_SUFFIXES = {".html", ".css", ".js", ".json", ".svg", ".txt", ".xml", ".bib"}
+
+_HASH_LENGTH = 10
+
+# Elements whose content is kept verbatim when minifying HTML
+_HTML_RAW_PATTERN = re.compile(
+    r"(<(pre|textarea|script|style)\b.*?</\2\s*>)", re.IGNORECASE | re.DOTALL
+)
+_HTML_COMMENT_PATTERN = re.compile(r"<!--(?!\[if).*?-->", re.DOTALL)
+_WHITESPACE_PATTERN = re.compile(r"\s+")
+
+# CSS strings and comments, so whitespace rules only apply to the code between them
+_CSS_TOKEN_PATTERN = re.compile(
+    r"(\"(?:\\.|[^\"\\])*\"|'(?:\\.|[^'\\])*')|/\*.*?\*/", re.DOTALL
+)
+_CSS_PUNCTUATION_PATTERN = re.compile(r"\s*([{};,>])\s*")
+
+# Asset references in HTML attributes and CSS
+_HTML_REFERENCE_PATTERN = re.compile(r"(\s(?:href|src)=)([\"'])([^\"']+)\2")
+_CSS_URL_PATTERN = re.compile(r"url\(\s*([\"']?)([^\"')]+)\1\s*\)")
+# Absolute URLs (with a scheme or protocol-relative) and in-page anchors
+_EXTERNAL_REFERENCE_PATTERN = re.compile(r"(?:[a-z][a-z0-9+.-]*:|//|#)", re.IGNORECASE)
+# Path and the query string and/or fragment following it
+_REFERENCE_SPLIT_PATTERN = re.compile(r"([^?#]*)(.*)", re.DOTALL)
+
+
+def _collapse_whitespace(text):
+    """Collapse whitespace runs to one newline if they contain one, else to one space"""
+    return _WHITESPACE_PATTERN.sub(lambda m: "\n" if "\n" in m.group() else " ", text)
+
+
+def minify_html(text):
+    """Remove comments and collapse whitespace, leaving pre/textarea/script/style content intact"""
+    parts = _HTML_RAW_PATTERN.split(text)
+    minified = []
+    # split() yields text, raw element, element name, text, ...
+    for index in range(0, len(parts), 3):
+        minified.append(
+            _collapse_whitespace(_HTML_COMMENT_PATTERN.sub("", parts[index]))
+        )
+        if index + 1 < len(parts):
+            raw = parts[index + 1]
+            if parts[index + 2].lower() == "style":
+                open_end = raw.index(">") + 1
+                close_start = raw.lower().rindex("</style")
+                raw = (
+                    raw[:open_end]
+                    + minify_css(raw[open_end:close_start])
+                    + raw[close_start:]
+                )
+            minified.append(raw)
+    return "".join(minified).strip() + "\n"
+
+
+def _minify_css_code(code):
+    """Minify CSS code that contains no strings or comments"""
+    code = _WHITESPACE_PATTERN.sub(" ", code)
+    code = _CSS_PUNCTUATION_PATTERN.sub(r"\1", code)
+    # ": " is left alone, since "a :hover" and "a:hover" are different selectors
+    return code.replace(";}", "}")
+
+
+def minify_css(text):
+    """Remove comments and redundant whitespace from CSS, leaving strings intact"""
+    # Comments become whitespace first, so they cannot split a run of code
+    text = _CSS_TOKEN_PATTERN.sub(lambda m: m.group(1) or " ", text)
+    minified = []
+    position = 0
+    for match in _CSS_TOKEN_PATTERN.finditer(text):
+        minified.append(_minify_css_code(text[position : match.start()]))
+        minified.append(match.group())
+        position = match.end()
+    minified.append(_minify_css_code(text[position:]))
+    return "".join(minified).strip()
+
+
+def _sha256(data):
+    """Hex SHA-256 digest of bytes"""
+    return hashlib.sha256(data).hexdigest()
+
+
+def _hashed_name(relative_path, data):
+    """Insert a content hash before the suffix, e.g. styles.css -> styles.1a2b3c4d5e.css"""
+    path = Path(relative_path)
+    digest = _sha256(data)[:_HASH_LENGTH]
+    return path.with_name(f"{path.stem}.{digest}{path.suffix}").as_posix()
+
+
+def _gzip_bytes(data):
+    """Compress deterministically (no timestamp), so unchanged input gives unchanged output"""
+    return gzip.compress(data, compresslevel=9, mtime=0)
+
+
+def _write_if_changed(path, data):
+    """Atomically replace path with data unless it already holds the same bytes"""
+    try:
+        if path.read_bytes() == data:
+            return False
+    except FileNotFoundError:
+        pass
+
+    return _write_atomically(path, lambda f: f.write(data))
+
+
+def _load_manifest(output_dir):
+    """Load the manifest of the previous build, or an empty one"""
+    try:
+        with open(output_dir / _MANIFEST_NAME, encoding="utf-8") as f:
+            manifest = json.load(f)
+        if manifest.get("version") == _MANIFEST_VERSION:
+            return manifest["files"]
+    except (OSError, ValueError, KeyError):
+        pass
+    return {}
+
+
+def _save_manifest(output_dir, files):
+    """Write the manifest for the next build"""
+    data = json.dumps(
+        {"version": _MANIFEST_VERSION, "files": files}, indent=1, sort_keys=True
+    )
+    _write_if_changed(output_dir / _MANIFEST_NAME, data.encode("utf-8"))
+
+
+def _collect_sources(project_root):
+    """Relative POSIX paths of all files that make up the site"""
+    sources = []
+    for name in _SOURCES:
+        path = project_root / name
+        if path.is_file():
+            sources.append(name)
+        elif path.is_dir():
+            sources.extend(
+                child.relative_to(project_root).as_posix()
+                for child in sorted(path.rglob("*"))
+                if child.is_file() and not child.name.endswith((".gz", ".tmp"))
+            )
+    return sources
+
+
+def _build_order(relative_path):
+    """Process plain assets first, then CSS (may reference images), then pages"""
+    if relative_path in _PAGES:
+        return 2
+    return 1 if relative_path.endswith(".css") else 0
+
+
+def _page_img_paths(project_root):
+    """Source paths of the images shown in <img> tags of the pages"""
+    paths = set()
+    for page in _PAGES:
+        try:
+            text = (project_root / page).read_text(encoding="utf-8")
+        except FileNotFoundError:
+            continue
+        base = os.path.dirname(page)
+        paths.update(_source_path(src, base) for src in img_sources(text))
+    return paths
+
+
+def _source_path(reference, base):
+    """Source path of a relative reference from a file in base, or None if it is external"""
+    if _EXTERNAL_REFERENCE_PATTERN.match(reference):
+        return None
+    path = _REFERENCE_SPLIT_PATTERN.match(reference).group(1)
+    return os.path.normpath(os.path.join(base, path)).replace(os.sep, "/")
+
+
+def _relative_url(path, base):
+    """URL of a site path relative to a file in base"""
+    return os.path.relpath(path, base or ".").replace(os.sep, "/")
+
+
+def _resolve_reference(reference, base, urls):
+    """Map a relative asset reference to its hashed URL, or None if it is not a hashed asset"""
+    hashed = urls.get(_source_path(reference, base))
+    if hashed is None:
+        return None
+    suffix = _REFERENCE_SPLIT_PATTERN.match(reference).group(2)
+    return _relative_url(hashed, base) + suffix
+
+
+def _page_images(images, base):
+    """Image info with variant URLs relative to a page in base"""
+
+    def relative(candidates):
+        return [[_relative_url(url, base), width] for url, width in candidates]
+
+    return {
+        path: {
+            "size": info["size"],
+            "srcset": relative(info["srcset"]),
+            "sources": [
+                [mime_type, relative(candidates)]
+                for mime_type, candidates in info["sources"]
+            ],
+        }
+        for path, info in images.items()
+    }
+
+
+def rewrite_html_references(text, base, urls):
+    """Point href/src attributes at hashed asset names"""
+
+    def replace(match):
+        resolved = _resolve_reference(match.group(3), base, urls)
+        if resolved is None:
+            return match.group()
+        return f"{match.group(1)}{match.group(2)}{resolved}{match.group(2)}"
+
+    return _HTML_REFERENCE_PATTERN.sub(replace, text)
+
+
+def rewrite_css_references(text, base, urls):
+    """Point url() references at hashed asset names"""
+
+    def replace(match):
+        resolved = _resolve_reference(match.group(2), base, urls)
+        if resolved is None:
+            return match.group()
+        return f"url({match.group(1)}{resolved}{match.group(1)})"
+
+    return _CSS_URL_PATTERN.sub(replace, text)
+
+
+def _load_critical_css_cache(cache_dir):
+    """Load the critical CSS cache, or an empty one"""
+    if cache_dir is None:
+        return {}
+    try:
+        with open(cache_dir / _CRITICAL_CSS_CACHE_NAME, encoding="utf-8") as f:
+            cache = json.load(f)
+        return cache if isinstance(cache, dict) else {}
+    except (OSError, ValueError):
+        return {}
+
+
+def _save_critical_css_cache(cache_dir, cache):
+    """Write the critical CSS cache for the next build"""
+    if cache_dir is not None:
+        data = json.dumps(cache, indent=1, sort_keys=True).encode("utf-8")
+        _write_if_changed(cache_dir / _CRITICAL_CSS_CACHE_NAME, data)
+
+
+def _process(relative_path, data, urls, images, stylesheets, critical_cache, minify):
+    """
+    Transform a source file, returning its output bytes.
+
+    stylesheets maps CSS source paths to their text with rewritten references;
+    pages inline the critical rules of the ones in their own directory, using
+    critical_cache (None disables inlining).
+    """
+    suffix = Path(relative_path).suffix.lower()
+    base = os.path.dirname(relative_path)
+    if suffix == ".html":
+        text = inject_responsive_images(
+            data.decode("utf-8"),
+            lambda src: _source_path(src, base),
+            _page_images(images, base),
+        )
+        if critical_cache is not None:
+            # url() references in inlined CSS must resolve from the page
+            local = {
+                path: css
+                for path, css in stylesheets.items()
+                if os.path.dirname(path) == base
+            }
+            text = inline_critical_css(
+                text,
+                lambda href: _source_path(href, base),
+                local,
+                critical_cache.setdefault(relative_path, {}),
+            )
+        text = rewrite_html_references(text, base, urls)
+        return (minify_html(text) if minify else text).encode("utf-8")
+    if suffix == ".css":
+        text = rewrite_css_references(data.decode("utf-8"), base, urls)
+        return (minify_css(text) if minify else text).encode("utf-8")
+    return data
+
+
+def _build_image_variants(relative_path, data, source_hash, output_dir, cache_dir):
+    """
+    Write responsive variants of an image.
+
+    Returns:
+        Tuple of (srcset, sources, outputs): srcset lists the [url, width]
+        candidates in the source format, sources the [mime type, candidates]
+        of extra formats, and outputs the written file names
+    """
+    candidates = {}
+    outputs = []
+    for image_format, width, name, encoded in generate_variants(
+        relative_path, data, source_hash, cache_dir
+    ):
+        name = _hashed_name(name, encoded)
+        _write_if_changed(output_dir / name, encoded)
+        outputs.append(name)
+        candidates.setdefault(image_format, []).append([name, width])
+
+    # generate_variants() lists extra formats first and the source format last
+    formats = list(candidates)
+    if not formats:
+        return [], [], outputs
+    sources = [[f"image/{fmt.lower()}", candidates[fmt]] for fmt in formats[:-1]]
+    return candidates[formats[-1]], sources, outputs
+
+
+def build_site(project_root, output_dir, minify=True, cache_dir=None, critical=True):
+    """
+    Build the site from project_root into output_dir.
+
+    Images shown in <img> tags of the pages get their dimensions and resized
+    variants, injected as srcset. With critical, pages inline the stylesheet
+    rules their first-paint markup uses and load the stylesheets without
+    blocking rendering. Image variants and critical CSS are cached in
+    cache_dir, if given.
+
+    Returns:
+        Tuple of (processed, unchanged) file counts
+    """
+    project_root = Path(project_root)
+    output_dir = Path(output_dir)
+    previous = _load_manifest(output_dir)
+    files = {}
+    urls = {}
+    images = {}
+    stylesheets = {}
+    processed = unchanged = 0
+    responsive = _page_img_paths(project_root)
+    image_cache_dir = cache_dir / "images" if cache_dir is not None else None
+    critical_cache = _load_critical_css_cache(cache_dir) if critical else None
+
+    for relative_path in sorted(_collect_sources(project_root), key=_build_order):
+        data = (project_root / relative_path).read_bytes()
+
+        # CSS and pages also depend on the hashed names and images they reference
+        source_hash = _sha256(data)
+        key = source_hash
+        if _build_order(relative_path) > 0:
+            references = json.dumps([urls, images], sort_keys=True)
+            key = _sha256(data + references.encode("utf-8"))
+        if relative_path in responsive:
+            key = _sha256(f"{key}:{int(can_generate_variants())}".encode())
+        if relative_path in _PAGES:
+            key = _sha256(f"{key}:{int(critical)}".encode())
+        key = _sha256(f"{key}:{int(minify)}".encode())
+
+        entry = previous.get(relative_path)
+        if (
+            entry
+            and entry["key"] == key
+            and all((output_dir / name).is_file() for name in entry["outputs"])
+        ):
+            unchanged += 1
+        else:
+            output = _process(
+                relative_path, data, urls, images, stylesheets, critical_cache, minify
+            )
+            name = relative_path
+            if Path(relative_path).suffix.lower() in _HASHED_SUFFIXES:
+                name = _hashed_name(relative_path, output)
+            outputs = [name]
+            _write_if_changed(output_dir / name, output)
+
+            if Path(relative_path).suffix.lower() in _COMPRESSED_SUFFIXES:
+                compressed = _gzip_bytes(output)
+                if len(compressed) < len(output):
+                    _write_if_changed(output_dir / f"{name}.gz", compressed)
+                    outputs.append(f"{name}.gz")
+            entry = {"key": key, "url": name, "outputs": outputs}
+
+            size = image_size(data) if relative_path in responsive else None
+            if size is not None:
+                srcset, sources, variant_outputs = _build_image_variants(
+                    relative_path, data, source_hash, output_dir, image_cache_dir
+                )
+                entry["image"] = {
+                    "size": list(size),
+                    "srcset": srcset,
+                    "sources": sources,
+                }
+                outputs.extend(variant_outputs)
+            processed += 1
+
+        files[relative_path] = entry
+        if entry["url"] != relative_path:
+            urls[relative_path] = entry["url"]
+        if "image" in entry:
+            images[relative_path] = entry["image"]
+        if relative_path.endswith(".css"):
+            base = os.path.dirname(relative_path)
+            stylesheets[relative_path] = rewrite_css_references(
+                data.decode("utf-8"), base, urls
+            )
+
+    # Remove outputs of deleted sources and superseded hashed names
+    current_outputs = {name for entry in files.values() for name in entry["outputs"]}
+    for entry in previous.values():
+        for name in entry.get("outputs", []):
+            if name not in current_outputs:
+                (output_dir / name).unlink(missing_ok=True)
+
+    _save_manifest(output_dir, files)
+    if critical_cache is not None:
+        _save_critical_css_cache(cache_dir, critical_cache)
+    return processed, unchanged
+
+
+def main():
+    """Main function"""
+    parser = argparse.ArgumentParser(
+        description="Build the deployable site with minified, hashed and precompressed assets"
+    )
+    parser.add_argument(
+        "-o",
+        "--output",
+        type=Path,
+        default=Path("build"),
+        help="Output directory, relative to the project root (default: build)",
+    )
+    parser.add_argument(
+        "--no-minify",
+        action="store_true",
+        help="Copy HTML and CSS without minifying them",
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Regenerate image variants and critical CSS instead of reusing them from .cache",
+    )
+    parser.add_argument(
+        "--no-critical-css",
+        action="store_true",
+        help="Keep stylesheets render-blocking instead of inlining their critical rules",
+    )
+    args = parser.parse_args()
+
+    # Get paths relative to script location
+    project_root = Path(__file__).parent.parent
+    output_dir = project_root / args.output
+
+    if not (project_root / "index.html").exists():
+        print(
+            f"Error: HTML file not found at {project_root / 'index.html'}",
+            file=sys.stderr,
+        )
+        sys.exit(1)
+
+    if not can_generate_variants():
+        print(
+            "Warning: Pillow is not installed, skipping responsive image variants "
+            "(install with: uv sync --extra images)",
+            file=sys.stderr,
+        )
+
+    cache_dir = None if args.no_cache else project_root / ".cache"
+    try:
+        processed, unchanged = build_site(
+            project_root,
+            output_dir,
+            minify=not args.no_minify,
+            cache_dir=cache_dir,
+            critical=not args.no_critical_css,
+        )
+    except (OSError, UnicodeDecodeError) as e:
+        print(f"Error building site: {e}", file=sys.stderr)
+        sys.exit(1)
+
+    print(
+        f"Built site in {output_dir}: {processed} files processed, {unchanged} unchanged"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,453 @@
+#!/usr/bin/env python3
+"""
+Check the publication links of the BibTeX bibliography concurrently
+
+Every link rendered for a publication (the DOI link, or the URL of entries
+without a DOI, see _get_link_info) is requested with HEAD, falling back to GET
+when a server rejects HEAD, and redirects are followed. Requests run on asyncio
+with a global concurrency limit and, per host, a limit and a pool of keep-alive
+connections, so thousands of links (most of them starting at doi.org) are
+checked in one pass. Results are cached in .cache/link-check.json: links that
+were fine within the TTL are not requested again, failed links are rechecked on
+every run.
+
+Only the standard library is used; the HTTP/1.1 client below implements just
+what checking a status code needs.
+"""
+
+import argparse
+import asyncio
+import json
+import ssl
+import sys
+import time
+from pathlib import Path
+from urllib.parse import quote, urljoin, urlsplit
+
+from scripts.bibtex_to_html import _get_link_info, _load_sources, _write_atomically
+
+# Cached results are reused only with the same format
+_CACHE_VERSION = 1
+
+_DEFAULT_TTL_DAYS = 7
+_MAX_REDIRECTS = 10
+_REDIRECT_STATUSES = {301, 302, 303, 307, 308}
+
+# GET response bodies up to this size are read, so the connection can be reused
+_MAX_DRAINED_BODY = 1 << 16
+
+_DEFAULT_PORTS = {"http": 80, "https": 443}
+_USER_AGENT = "dschaub95.github.io-link-checker/1.0"
+
+# Characters left unescaped in request targets, besides letters and digits
+_SAFE_TARGET_CHARS = "/%:@!$&'()*+,;=-._~?"
+
+
+def collect_links(keyed_entries):
+    """Map each publication link to the citation keys using it, in entry order"""
+    links = {}
+    for _, key, entry in keyed_entries:
+        url = _get_link_info(entry)[0]
+        if url:
+            links.setdefault(url, []).append(key)
+    return links
+
+
+def _percentile(sorted_values, fraction):
+    """Value at fraction (0-1) of an ascending list"""
+    return sorted_values[
+        min(len(sorted_values) - 1, int(len(sorted_values) * fraction))
+    ]
+
+
+def _load_link_cache(cache_path):
+    """Load cached link results, returning an empty cache if missing, unreadable or outdated"""
+    try:
+        with open(cache_path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        if data.get("version") == _CACHE_VERSION:
+            return data.get("links", {})
+    except (OSError, ValueError, AttributeError):
+        pass
+    return {}
+
+
+def _save_link_cache(cache_path, links):
+    """Write cached link results atomically"""
+    try:
+        _write_atomically(
+            cache_path,
+            lambda f: json.dump(
+                {"version": _CACHE_VERSION, "links": links}, f, indent=1
+            ),
+            mode="w",
+            encoding="utf-8",
+        )
+    except OSError as e:
+        print(f"Warning: could not write link cache: {e}", file=sys.stderr)
+
+
+def link_ok(result):
+    """Whether a check result is a success (2xx after redirects)"""
+    status = result.get("status")
+    return status is not None and 200 <= status < 300
+
+
+class _HostPool:
+    """Keep-alive connections and the concurrency limit of one scheme://host:port"""
+
+    def __init__(self, scheme, host, port, limit):
+        self.scheme = scheme
+        self.host = host
+        self.port = port
+        self.slots = asyncio.Semaphore(limit)
+        self.idle = []
+
+
+class _LinkChecker:
+    """Checks URLs over pooled connections, counting requests and connections"""
+
+    def __init__(self, concurrency, per_host, timeout):
+        self.slots = asyncio.Semaphore(concurrency)
+        self.per_host = per_host
+        self.timeout = timeout
+        self.pools = {}
+        self.ssl_context = ssl.create_default_context()
+        self.stats = {"HEAD": 0, "GET": 0, "connections": 0, "latencies": []}
+
+    def _pool(self, scheme, host, port):
+        key = (scheme, host, port)
+        if key not in self.pools:
+            self.pools[key] = _HostPool(scheme, host, port, self.per_host)
+        return self.pools[key]
+
+    async def _connect(self, pool):
+        self.stats["connections"] += 1
+        return await asyncio.open_connection(
+            pool.host,
+            pool.port,
+            ssl=self.ssl_context if pool.scheme == "https" else None,
+        )
+
+    async def _exchange(self, reader, writer, method, target, host_header):
+        """Send one request and read the response head, returning (status, headers, reusable)"""
+        writer.write(
+            (
+                f"{method} {target} HTTP/1.1\r\n"
+                f"Host: {host_header}\r\n"
+                f"User-Agent: {_USER_AGENT}\r\n"
+                "Accept: */*\r\n"
+                "Connection: keep-alive\r\n\r\n"
+            ).encode("latin-1")
+        )
+        await writer.drain()
+
+        status_line = await reader.readline()
+        if not status_line:
+            raise ConnectionResetError("connection closed by server")
+        version, status = status_line.decode("latin-1").split(None, 2)[:2]
+        headers = {}
+        while True:
+            line = await reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+        status = int(status)
+
+        reusable = (
+            version == "HTTP/1.1" and headers.get("connection", "").lower() != "close"
+        )
+        if method == "HEAD" or status in (204, 304) or 100 <= status < 200:
+            return status, headers, reusable
+        # Drain small bodies to keep the connection; close on anything else
+        length = headers.get("content-length", "")
+        if (
+            "transfer-encoding" not in headers
+            and length.isdigit()
+            and int(length) <= _MAX_DRAINED_BODY
+        ):
+            await reader.readexactly(int(length))
+            return status, headers, reusable
+        return status, headers, False
+
+    async def request(self, method, url):
+        """Request url, returning (status, headers)"""
+        parts = urlsplit(url)
+        scheme = parts.scheme.lower()
+        if scheme not in _DEFAULT_PORTS or not parts.hostname:
+            raise ValueError(f"unsupported URL {url!r}")
+        port = parts.port or _DEFAULT_PORTS[scheme]
+        pool = self._pool(scheme, parts.hostname, port)
+        host_header = parts.netloc.rpartition("@")[2]
+        target = quote(parts.path or "/", safe=_SAFE_TARGET_CHARS)
+        if parts.query:
+            target += "?" + quote(parts.query, safe=_SAFE_TARGET_CHARS)
+
+        # Wait for the host before taking a global slot, so requests queued for
+        # one busy host (e.g. doi.org) do not hold up the others. The timeout
+        # starts once the request is sent, not while it is queued.
+        async with pool.slots, self.slots:
+            self.stats[method] += 1
+            start = time.perf_counter()
+            response = await asyncio.wait_for(
+                self._send(pool, method, target, host_header), self.timeout
+            )
+            self.stats["latencies"].append(time.perf_counter() - start)
+            return response
+
+    async def _send(self, pool, method, target, host_header):
+        """Exchange a request on a pooled or new connection, returning (status, headers)"""
+        # A pooled connection may have been closed by the server while idle;
+        # such failures move on to the next idle connection, then a new one
+        while True:
+            pooled = bool(pool.idle)
+            reader, writer = pool.idle.pop() if pooled else await self._connect(pool)
+            try:
+                status, headers, reusable = await self._exchange(
+                    reader, writer, method, target, host_header
+                )
+            except (ConnectionError, asyncio.IncompleteReadError):
+                writer.close()
+                if pooled:
+                    continue
+                raise
+            except BaseException:
+                writer.close()
+                raise
+            if reusable:
+                pool.idle.append((reader, writer))
+            else:
+                writer.close()
+            return status, headers
+
+    async def _follow(self, method, url):
+        """Request url with method, following redirects; returns (status, final url)"""
+        for _ in range(_MAX_REDIRECTS + 1):
+            status, headers = await self.request(method, url)
+            location = headers.get("location")
+            if status not in _REDIRECT_STATUSES or not location:
+                return status, url
+            url = urljoin(url, location)
+        raise ValueError(f"more than {_MAX_REDIRECTS} redirects")
+
+    async def check(self, url):
+        """Check one URL, returning its result dict"""
+        start = time.perf_counter()
+        result = {"status": None, "error": None, "final_url": url}
+        try:
+            status, final_url = await self._follow("HEAD", url)
+            # Many servers reject or mishandle HEAD (405, 403, 404); confirm with GET
+            if status >= 400:
+                status, final_url = await self._follow("GET", url)
+            result["status"] = status
+            result["final_url"] = final_url
+        except asyncio.TimeoutError:
+            result["error"] = f"timed out after {self.timeout:g} s"
+        except (OSError, ValueError, asyncio.IncompleteReadError) as e:
+            result["error"] = str(e) or type(e).__name__
+        result["seconds"] = time.perf_counter() - start
+        result["checked"] = time.time()
+        return result
+
+    async def close(self):
+        """Close all idle connections"""
+        writers = [writer for pool in self.pools.values() for _, writer in pool.idle]
+        for pool in self.pools.values():
+            pool.idle.clear()
+        for writer in writers:
+            writer.close()
+        await asyncio.gather(
+            *(writer.wait_closed() for writer in writers), return_exceptions=True
+        )
+
+
+async def _check_all(urls, concurrency, per_host, timeout):
+    """Check urls concurrently, returning (results by url, checker stats)"""
+    checker = _LinkChecker(concurrency, per_host, timeout)
+    try:
+        results = await asyncio.gather(*(checker.check(url) for url in urls))
+    finally:
+        await checker.close()
+    return dict(zip(urls, results)), checker.stats
+
+
+def check_links(urls, concurrency=32, per_host=4, timeout=10.0):
+    """
+    Check URLs concurrently with HEAD-then-GET requests.
+
+    Args:
+        urls: URLs to check
+        concurrency: Requests in flight at most
+        per_host: Requests in flight, and idle connections kept, per host at most
+        timeout: Seconds allowed for each request
+
+    Returns:
+        (results, stats): results maps each URL to {"status", "error",
+        "final_url", "seconds", "checked"}, where status is the final HTTP
+        status (None on network errors) and seconds includes queueing and
+        redirects; stats counts HEAD and GET requests and opened connections,
+        and lists the latency of every request
+    """
+    urls = list(dict.fromkeys(urls))
+    return asyncio.run(_check_all(urls, max(1, concurrency), max(1, per_host), timeout))
+
+
+def _check_report(results, stats, elapsed, cached_count):
+    """Throughput and request latency summary of a check run"""
+    checked = sum(1 for result in results.values() if "cached" not in result)
+    lines = [
+        f"Checked {checked} links in {elapsed:.2f} s"
+        f" ({checked / elapsed if elapsed else 0:.1f} links/sec),"
+        f" {cached_count} fresh in cache"
+    ]
+    if stats["latencies"]:
+        latencies = sorted(seconds * 1000 for seconds in stats["latencies"])
+        lines.append(
+            f"Requests: {stats['HEAD']} HEAD, {stats['GET']} GET "
+            f"over {stats['connections']} connections"
+        )
+        lines.append(
+            f"Request latency p50: {_percentile(latencies, 0.5):.1f} ms, "
+            f"p90: {_percentile(latencies, 0.9):.1f} ms, "
+            f"p99: {_percentile(latencies, 0.99):.1f} ms, "
+            f"max: {latencies[-1]:.1f} ms"
+        )
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    """Main function"""
+    parser = argparse.ArgumentParser(
+        description="Check the DOI and URL links of the publications"
+    )
+    parser.add_argument(
+        "--bibtex",
+        action="append",
+        type=Path,
+        metavar="PATH",
+        help="BibTeX file or directory, as in bibtex-to-html (repeatable; "
+        "default: data/publications.bib)",
+    )
+    parser.add_argument(
+        "--url",
+        action="append",
+        metavar="URL",
+        help="Check this URL instead of the publication links (repeatable), "
+        "e.g. against a local server",
+    )
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=32,
+        help="Requests in flight at most (default: 32)",
+    )
+    parser.add_argument(
+        "--per-host",
+        type=int,
+        default=4,
+        help="Requests in flight and idle connections per host at most (default: 4)",
+    )
+    parser.add_argument(
+        "--timeout",
+        type=float,
+        default=10.0,
+        help="Seconds allowed for each request (default: 10)",
+    )
+    parser.add_argument(
+        "--ttl",
+        type=float,
+        default=_DEFAULT_TTL_DAYS,
+        metavar="DAYS",
+        help=f"Reuse successful results younger than this (default: {_DEFAULT_TTL_DAYS})",
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Check every link instead of reusing and updating .cache/link-check.json",
+    )
+    parser.add_argument(
+        "-v",
+        "--verbose",
+        action="store_true",
+        help="List every link with its status and latency",
+    )
+    args = parser.parse_args(argv)
+
+    project_root = Path(__file__).parent.parent
+    cache_path = None if args.no_cache else project_root / ".cache" / "link-check.json"
+
+    if args.url:
+        links = {url: [] for url in args.url}
+    else:
+        bibtex_path = [
+            project_root / path
+            for path in args.bibtex or [Path("data") / "publications.bib"]
+        ]
+        for source in bibtex_path:
+            if not source.exists():
+                print(f"Error: BibTeX file not found at {source}", file=sys.stderr)
+                sys.exit(1)
+        links = collect_links(
+            _load_sources(
+                bibtex_path, None if args.no_cache else project_root / ".cache"
+            )
+        )
+
+    cache = _load_link_cache(cache_path) if cache_path is not None else {}
+    now = time.time()
+    results = {}
+    for url in links:
+        cached = cache.get(url)
+        if (
+            cached
+            and link_ok(cached)
+            and now - cached.get("checked", 0) < args.ttl * 86400
+        ):
+            results[url] = dict(cached, cached=True)
+    stale = [url for url in links if url not in results]
+
+    start = time.perf_counter()
+    checked, stats = (
+        check_links(stale, args.concurrency, args.per_host, args.timeout)
+        if stale
+        else ({}, {"HEAD": 0, "GET": 0, "connections": 0, "latencies": []})
+    )
+    elapsed = time.perf_counter() - start
+    results.update(checked)
+
+    if cache_path is not None and checked:
+        cache.update(checked)
+        # Expired results would be rechecked anyway; dropping them keeps links of
+        # removed publications from accumulating
+        _save_link_cache(
+            cache_path,
+            {
+                url: result
+                for url, result in cache.items()
+                if now - result.get("checked", 0) < args.ttl * 86400
+            },
+        )
+
+    failures = 0
+    for url, keys in links.items():
+        result = results[url]
+        label = f" ({', '.join(keys)})" if keys else ""
+        if not link_ok(result):
+            failures += 1
+            problem = result["error"] or f"HTTP {result['status']}"
+            print(f"BROKEN {url}: {problem}{label}")
+        elif args.verbose:
+            latency = (
+                "cached" if "cached" in result else f"{result['seconds'] * 1000:.0f} ms"
+            )
+            print(f"OK {result['status']} {url} [{latency}]{label}")
+
+    print(_check_report(results, stats, elapsed, len(links) - len(stale)))
+    if failures:
+        print(f"{failures} of {len(links)} links failed", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,227 @@
+#!/usr/bin/env python3
+"""
+Critical CSS extraction for the site build
+
+The rules a page needs for its first paint (the markup before <main>, plus the
+publications section, whose cards and citations share a handful of classes)
+are inlined into a <style> element, and the full stylesheet is loaded without
+blocking rendering. A selector counts as used when every tag, class and id it
+names occurs in that markup; pseudo-classes and attribute selectors are
+ignored, so the selection errs on the side of inlining too much.
+"""
+
+import hashlib
+import html
+import re
+
+# Cache entries are reused only with the same format
+_CACHE_VERSION = 1
+
+_STRING_PATTERN = re.compile(r"\"(?:\\.|[^\"\\])*\"|'(?:\\.|[^'\\])*'")
+# Strings (group 1) and comments
+_CSS_TOKEN_PATTERN = re.compile(rf"({_STRING_PATTERN.pattern})|/\*.*?\*/", re.DOTALL)
+
+# Markup considered above the fold: everything before <main>, and the
+# publications section injected by bibtex_to_html.py (with its ancestors)
+_FOLD_END_PATTERN = re.compile(r"<main\b", re.IGNORECASE)
+_PUBLICATIONS_PATTERN = re.compile(
+    r'<section id="publications">.*?</section>', re.IGNORECASE | re.DOTALL
+)
+
+_TAG_PATTERN = re.compile(r"<([a-zA-Z][a-zA-Z0-9-]*)")
+_START_END_TAG_PATTERN = re.compile(r"<(/?)([a-zA-Z][a-zA-Z0-9-]*)[^>]*>")
+_VOID_ELEMENTS = {
+    "area", "base", "br", "col", "embed", "hr", "img", "input", "link", "meta",
+    "source", "track", "wbr",
+}  # fmt: skip
+_CLASS_PATTERN = re.compile(r"""\sclass=(["'])(.*?)\1""", re.IGNORECASE | re.DOTALL)
+_ID_PATTERN = re.compile(r"""\sid=(["'])(.*?)\1""", re.IGNORECASE | re.DOTALL)
+
+# Parts of a selector that do not restrict which elements must exist
+_SELECTOR_IGNORED_PATTERN = re.compile(
+    r"\[[^\]]*\]|::?[a-zA-Z-]+(?:\([^)]*\))?", re.DOTALL
+)
+_SELECTOR_NAME_PATTERN = re.compile(
+    r"([.#]?)(-?[_a-zA-Z][_a-zA-Z0-9-]*|\\.)", re.DOTALL
+)
+
+_STYLESHEET_LINK_PATTERN = re.compile(
+    r"""<link\b[^>]*\brel=(["'])stylesheet\1[^>]*>""", re.IGNORECASE
+)
+_HREF_PATTERN = re.compile(r"""\bhref=(["'])(.*?)\1""", re.IGNORECASE)
+_REL_PATTERN = re.compile(r"""\brel=(["'])stylesheet\1""", re.IGNORECASE)
+
+# Loads a stylesheet without blocking rendering and applies it once loaded
+_PRELOAD_ATTRIBUTES = (
+    'rel="preload" as="style" onload="this.onload=null;this.rel=\'stylesheet\'"'
+)
+
+
+def _open_start_tags(markup):
+    """Start tags of the elements still open at the end of markup"""
+    stack = []
+    for match in _START_END_TAG_PATTERN.finditer(markup):
+        name = match.group(2).lower()
+        if not match.group(1):
+            if name not in _VOID_ELEMENTS and not match.group().endswith("/>"):
+                stack.append((name, match.group()))
+            continue
+        # Close the innermost matching element, ignoring stray end tags
+        for index in range(len(stack) - 1, -1, -1):
+            if stack[index][0] == name:
+                del stack[index:]
+                break
+    return [tag for _, tag in stack]
+
+
+def fold_markup(page):
+    """The parts of a page that are rendered first"""
+    match = _FOLD_END_PATTERN.search(page)
+    if not match:
+        return page
+    fold = page[: match.start()]
+    publications = _PUBLICATIONS_PATTERN.search(page, match.start())
+    if publications:
+        between = page[match.start() : publications.start()]
+        fold += "".join(_open_start_tags(between)) + publications.group()
+    return fold
+
+
+def markup_names(markup):
+    """Tag names, classes (".name") and ids ("#name") used in markup"""
+    names = {tag.lower() for tag in _TAG_PATTERN.findall(markup)}
+    for _, value in _CLASS_PATTERN.findall(markup):
+        names.update("." + name for name in html.unescape(value).split())
+    for _, value in _ID_PATTERN.findall(markup):
+        names.add("#" + html.unescape(value).strip())
+    return names
+
+
+def _selector_used(selector, names):
+    """Whether every tag, class and id in selector occurs in names"""
+    selector = _SELECTOR_IGNORED_PATTERN.sub(" ", selector)
+    for prefix, name in _SELECTOR_NAME_PATTERN.findall(selector):
+        if name.startswith("\\"):
+            # Escaped characters: give up on the selector and keep it
+            return True
+        if (prefix + name if prefix else name.lower()) not in names:
+            return False
+    return True
+
+
+def _split_blocks(css):
+    """
+    Split CSS into top-level (prelude, body) pairs.
+
+    Declarations outside any block are dropped. Strings are respected when
+    matching braces; comments must already be removed.
+    """
+    blocks = []
+    position = 0
+    depth = 0
+    prelude_start = 0
+    body_start = None
+    prelude = ""
+    while position < len(css):
+        string = _STRING_PATTERN.match(css, position)
+        if string:
+            position = string.end()
+            continue
+        char = css[position]
+        if char == "{":
+            if depth == 0:
+                prelude = css[prelude_start:position].strip()
+                body_start = position + 1
+            depth += 1
+        elif char == "}" and depth > 0:
+            depth -= 1
+            if depth == 0:
+                blocks.append((prelude, css[body_start:position]))
+                prelude_start = position + 1
+        elif char == ";" and depth == 0:
+            # Statement at-rules such as @import and @charset
+            statement = css[prelude_start : position + 1].strip()
+            if statement.startswith("@"):
+                blocks.append((statement, None))
+            prelude_start = position + 1
+        position += 1
+    return blocks
+
+
+def _critical_blocks(blocks, names):
+    """CSS text of the blocks whose selectors are used, recursing into @media"""
+    parts = []
+    for prelude, body in blocks:
+        if body is None:
+            parts.append(prelude)
+        elif prelude.startswith("@media") or prelude.startswith("@supports"):
+            inner = _critical_blocks(_split_blocks(body), names)
+            if inner:
+                parts.append(f"{prelude}{{{inner}}}")
+        elif prelude.startswith("@"):
+            # @font-face, @keyframes and the like are kept whole
+            parts.append(f"{prelude}{{{body}}}")
+        else:
+            selectors = [
+                selector.strip()
+                for selector in prelude.split(",")
+                if _selector_used(selector, names)
+            ]
+            if selectors:
+                parts.append(f"{','.join(selectors)}{{{body.strip()}}}")
+    return "".join(parts)
+
+
+def critical_css(css, names):
+    """The rules of css whose selectors match names, see markup_names()"""
+    css = _CSS_TOKEN_PATTERN.sub(lambda m: m.group(1) or " ", css)
+    return _critical_blocks(_split_blocks(css), names)
+
+
+def _cache_key(css, names):
+    """Digest of a stylesheet and the markup names it is matched against"""
+    digest = hashlib.sha256(f"{_CACHE_VERSION}\0".encode("utf-8"))
+    digest.update(css.encode("utf-8"))
+    digest.update("\0".join(sorted(names)).encode("utf-8"))
+    return digest.hexdigest()
+
+
+def inline_critical_css(page, resolve, stylesheets, cache):
+    """
+    Inline the critical rules of a page's stylesheets and load them without blocking.
+
+    Args:
+        page: HTML page
+        resolve: Function mapping a stylesheet href to its source path, or None
+            if the stylesheet cannot be inlined (e.g. external)
+        stylesheets: Dict of source path -> CSS text
+        cache: Dict of source path -> {"key", "css"}, updated in place. The
+            critical CSS is only recomputed when the stylesheet or the set of
+            tags, classes and ids in the page's first-paint markup changes.
+
+    Each <link rel="stylesheet"> is preceded by a <style> with its critical
+    rules and turned into a preload that applies the stylesheet once loaded,
+    with a <noscript> fallback.
+    """
+    names = None
+
+    def replace(match):
+        nonlocal names
+        tag = match.group()
+        href = _HREF_PATTERN.search(tag)
+        path = resolve(html.unescape(href.group(2))) if href else None
+        css = stylesheets.get(path)
+        if css is None or "media=" in tag.lower():
+            return tag
+
+        if names is None:
+            names = markup_names(fold_markup(page))
+        key = _cache_key(css, names)
+        cached = cache.get(path)
+        if not cached or cached["key"] != key:
+            cached = cache[path] = {"key": key, "css": critical_css(css, names)}
+
+        preload = _REL_PATTERN.sub(_PRELOAD_ATTRIBUTES, tag, count=1)
+        return f"<style>{cached['css']}</style>{preload}<noscript>{tag}</noscript>"
+
+    return _STYLESHEET_LINK_PATTERN.sub(replace, page)
@@ -0,0 +1,231 @@
+#!/usr/bin/env python3
+"""
+Responsive image variants for the site build
+
+Raster images are resized to a few standard widths and re-encoded (WebP when
+Pillow supports it, plus the source format as a fallback). Variants are cached
+by source hash, so each image is only resized once. Pillow is optional
+(`uv sync --extra images`); without it, images are still given explicit
+dimensions, read from the file header, to avoid layout shift.
+"""
+
+import html
+import io
+import re
+import struct
+from pathlib import Path
+
+try:
+    from PIL import Image, features
+except ImportError:
+    Image = None
+
+# Widths generated for every image, capped at the source width
+_VARIANT_WIDTHS = (160, 320, 480, 640, 960, 1280, 1920)
+
+# Source formats that get resized variants
+_RESIZABLE_SUFFIXES = {".png", ".jpg", ".jpeg"}
+
+_WEBP_QUALITY = 80
+_JPEG_QUALITY = 85
+
+# Bump when variant encoding changes, so cached variants are regenerated
+_VARIANT_VERSION = 1
+
+_IMG_PATTERN = re.compile(r"<img\b[^>]*>", re.IGNORECASE)
+_ATTRIBUTE_PATTERN = re.compile(r"""\s([a-zA-Z-]+)(?:=(["'])(.*?)\2)?""", re.DOTALL)
+_JPEG_SOF_MARKERS = {
+    0xC0, 0xC1, 0xC2, 0xC3, 0xC5, 0xC6, 0xC7, 0xC9, 0xCA, 0xCB, 0xCD, 0xCE, 0xCF
+}  # fmt: skip
+
+
+def can_generate_variants():
+    """Whether Pillow is installed, i.e. variants can be generated"""
+    return Image is not None
+
+
+def _webp_supported():
+    """Whether Pillow was built with WebP support"""
+    return Image is not None and features.check("webp")
+
+
+def image_size(data):
+    """(width, height) of PNG, GIF or JPEG data from its header, or None"""
+    if data.startswith(b"\x89PNG\r\n\x1a\n") and data[12:16] == b"IHDR":
+        return struct.unpack(">II", data[16:24])
+    if data[:6] in (b"GIF87a", b"GIF89a"):
+        return struct.unpack("<HH", data[6:10])
+    if data.startswith(b"\xff\xd8"):
+        # Walk the segments up to the start-of-frame marker
+        position = 2
+        while position + 9 < len(data):
+            if data[position] != 0xFF:
+                return None
+            marker = data[position + 1]
+            (length,) = struct.unpack(">H", data[position + 2 : position + 4])
+            if marker in _JPEG_SOF_MARKERS:
+                height, width = struct.unpack(">HH", data[position + 5 : position + 9])
+                return width, height
+            position += 2 + length
+    return None
+
+
+def _variant_widths(source_width):
+    """Widths to generate for an image, including its own width"""
+    widths = [width for width in _VARIANT_WIDTHS if width < source_width]
+    return widths + [source_width]
+
+
+def _encode(image, width, image_format):
+    """Resize image to width and encode it in image_format"""
+    if width < image.width:
+        height = max(1, round(image.height * width / image.width))
+        image = image.resize((width, height), Image.LANCZOS)
+
+    buffer = io.BytesIO()
+    if image_format == "WEBP":
+        image.save(buffer, "WEBP", quality=_WEBP_QUALITY, method=6)
+    elif image_format == "JPEG":
+        image.convert("RGB").save(
+            buffer, "JPEG", quality=_JPEG_QUALITY, optimize=True, progressive=True
+        )
+    else:
+        image.save(buffer, "PNG", optimize=True)
+    return buffer.getvalue()
+
+
+def generate_variants(relative_path, data, source_hash, cache_dir=None):
+    """
+    Resized and re-encoded variants of an image.
+
+    Args:
+        relative_path: Path of the image relative to the site root
+        data: Image bytes
+        source_hash: Hex digest of data, used as the cache key
+        cache_dir: Directory for cached variants, or None to disable caching
+
+    Returns:
+        List of (format, width, name, bytes), where name is the variant's path
+        before content hashing (e.g. "data/image-320w.webp"). Empty for formats
+        that are not resized or when Pillow is not installed.
+    """
+    path = Path(relative_path)
+    if Image is None or path.suffix.lower() not in _RESIZABLE_SUFFIXES:
+        return []
+    size = image_size(data)
+    if size is None:
+        return []
+
+    source_format = "JPEG" if path.suffix.lower() in (".jpg", ".jpeg") else "PNG"
+    formats = [source_format]
+    if _webp_supported():
+        formats.insert(0, "WEBP")
+
+    image = None
+    variants = []
+    for image_format in formats:
+        extension = "webp" if image_format == "WEBP" else path.suffix.lstrip(".")
+        for width in _variant_widths(size[0]):
+            cache_path = None
+            encoded = None
+            if cache_dir is not None:
+                cache_path = (
+                    Path(cache_dir)
+                    / f"{source_hash}-v{_VARIANT_VERSION}-{width}w.{extension}"
+                )
+                try:
+                    encoded = cache_path.read_bytes()
+                except OSError:
+                    pass
+            if encoded is None:
+                if image is None:
+                    image = Image.open(io.BytesIO(data))
+                    image.load()
+                encoded = _encode(image, width, image_format)
+                if cache_path is not None:
+                    cache_path.parent.mkdir(parents=True, exist_ok=True)
+                    cache_path.write_bytes(encoded)
+            name = path.with_name(f"{path.stem}-{width}w.{extension}").as_posix()
+            variants.append((image_format, width, name, encoded))
+    return variants
+
+
+def _attributes(tag):
+    """Attribute names and unescaped values of an HTML start tag"""
+    return {
+        name.lower(): html.unescape(value or "")
+        for name, _, value in _ATTRIBUTE_PATTERN.findall(tag)
+    }
+
+
+def img_sources(text):
+    """src attributes of the <img> tags in an HTML page"""
+    sources = []
+    for match in _IMG_PATTERN.finditer(text):
+        src = _attributes(match.group()).get("src")
+        if src:
+            sources.append(src)
+    return sources
+
+
+def _srcset(candidates):
+    """srcset value from (url, width) pairs"""
+    return html.escape(", ".join(f"{url} {width}w" for url, width in candidates))
+
+
+def inject_responsive_images(text, resolve, images):
+    """
+    Add dimensions and srcset/sizes to <img> tags of local images.
+
+    Args:
+        text: HTML page
+        resolve: Function mapping an img src to the source path of the image,
+            or None if it is not a local image
+        images: Dict of source path -> {"size": [width, height],
+            "srcset": [[url, width], ...], "sources": [[mime type,
+            [[url, width], ...]], ...]}, with urls relative to the page
+
+    Images with extra formats (e.g. WebP) are wrapped in a <picture> element
+    with one <source> per format, falling back to the <img> srcset. Tags that
+    already have a srcset only get dimensions. Without an explicit sizes
+    attribute, sizes defaults to 100vw.
+    """
+
+    def replace(match):
+        tag = match.group()
+        attributes = _attributes(tag)
+        info = images.get(resolve(attributes.get("src", "")))
+        if info is None:
+            return tag
+
+        additions = []
+        if "width" not in attributes and "height" not in attributes:
+            width, height = info["size"]
+            additions.append(f'width="{width}" height="{height}"')
+        if "srcset" in attributes or not info["srcset"]:
+            return _add_attributes(tag, additions)
+
+        sizes = attributes.get("sizes") or "100vw"
+        if "sizes" not in attributes:
+            additions.append(f'sizes="{sizes}"')
+        additions.append(f'srcset="{_srcset(info["srcset"])}"')
+        tag = _add_attributes(tag, additions)
+        if not info["sources"]:
+            return tag
+
+        sources = "".join(
+            f'<source type="{mime_type}" srcset="{_srcset(candidates)}" '
+            f'sizes="{html.escape(sizes)}">'
+            for mime_type, candidates in info["sources"]
+        )
+        return f"<picture>{sources}{tag}</picture>"
+
+    return _IMG_PATTERN.sub(replace, text)
+
+
+def _add_attributes(tag, additions):
+    """Insert attributes before the end of a start tag"""
+    if not additions:
+        return tag
+    end = len(tag) - 2 if tag.endswith("/>") else len(tag) - 1
+    return f"{tag[:end].rstrip()} {' '.join(additions)}{tag[end:]}"
@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""
+Stage and per-entry timing for the BibTeX to HTML pipeline
+
+The pipeline calls stage() and record_entry() unconditionally; both are no-ops
+unless a BuildProfile has been activated with profiling(), e.g.
+
+    profile = BuildProfile()
+    with profiling(profile):
+        build_publications(bibtex_path, [("card", True)])
+    print(profile.report())
+    data = profile.to_dict()
+"""
+
+import json
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+# Profile collecting measurements, if any
+_active = None
+
+
+class BuildProfile:
+    """Wall time and allocated-block deltas per pipeline stage and per rendered entry"""
+
+    def __init__(self):
+        self.stages = {}
+        self.entries = []
+        self.events = []
+        self._origin = time.perf_counter()
+
+    def add_stage(self, name, start, seconds, blocks):
+        """Accumulate one run of a stage; stages that run per entry are summed"""
+        totals = self.stages.setdefault(name, {"calls": 0, "seconds": 0.0, "blocks": 0})
+        totals["calls"] += 1
+        totals["seconds"] += seconds
+        totals["blocks"] += blocks
+        self.events.append(
+            {
+                "name": name,
+                "ph": "X",
+                "ts": (start - self._origin) * 1e6,
+                "dur": seconds * 1e6,
+                "pid": os.getpid(),
+                "tid": threading.get_ident(),
+            }
+        )
+
+    def add_stage_totals(self, stages):
+        """Accumulate stage totals measured by another profile, e.g. in a worker process"""
+        for name, other in stages.items():
+            totals = self.stages.setdefault(
+                name, {"calls": 0, "seconds": 0.0, "blocks": 0}
+            )
+            for field in ("calls", "seconds", "blocks"):
+                totals[field] += other[field]
+
+    def add_entry(self, mode, key, seconds, blocks):
+        """Record the rendering of a single entry"""
+        self.entries.append(
+            {"mode": mode, "key": key, "seconds": seconds, "blocks": blocks}
+        )
+
+    def slowest_entries(self, count=10):
+        """Entries sorted by rendering time, slowest first"""
+        return sorted(self.entries, key=lambda e: e["seconds"], reverse=True)[:count]
+
+    def report(self, top=10):
+        """Human-readable summary of stages and the slowest entries"""
+        lines = [f"{'Stage':<24}{'Calls':>8}{'Time (ms)':>12}{'Blocks':>12}"]
+        for name, totals in self.stages.items():
+            lines.append(
+                f"{name:<24}{totals['calls']:>8}{totals['seconds'] * 1000:>12.1f}"
+                f"{totals['blocks']:>12}"
+            )
+
+        slowest = self.slowest_entries(top)
+        if slowest:
+            lines.append("")
+            lines.append(f"Slowest {len(slowest)} of {len(self.entries)} entries:")
+            for entry in slowest:
+                lines.append(
+                    f"  {entry['seconds'] * 1000:8.2f} ms  {entry['blocks']:>8} blocks  "
+                    f"{entry['mode']}:{entry['key']}"
+                )
+        return "\n".join(lines)
+
+    def to_dict(self):
+        """Measurements as plain data; traceEvents loads in chrome://tracing or Perfetto"""
+        return {
+            "stages": self.stages,
+            "entries": self.entries,
+            "traceEvents": self.events,
+        }
+
+    def write_json(self, path):
+        """Write the measurements as a JSON trace"""
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.to_dict(), f, indent=1)
+
+
+@contextmanager
+def profiling(profile):
+    """Collect stage and entry measurements into profile while the block runs"""
+    global _active
+    previous, _active = _active, profile
+    try:
+        yield profile
+    finally:
+        _active = previous
+
+
+def is_profiling():
+    """Whether a profile is collecting measurements"""
+    return _active is not None
+
+
+@contextmanager
+def stage(name):
+    """Time a pipeline stage if profiling is active"""
+    profile = _active
+    if profile is None:
+        yield
+        return
+
+    blocks = sys.getallocatedblocks()
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        profile.add_stage(
+            name,
+            start,
+            time.perf_counter() - start,
+            sys.getallocatedblocks() - blocks,
+        )
+
+
+def record_entry(mode, key, seconds, blocks):
+    """Record the rendering of a single entry if profiling is active"""
+    if _active is not None:
+        _active.add_entry(mode, key, seconds, blocks)
+
+
+def record_stages(stages):
+    """Merge stage totals measured elsewhere, e.g. in a worker process, if profiling is active"""
+    if _active is not None:
+        _active.add_stage_totals(stages)
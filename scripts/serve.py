@@ -1,12 +1,449 @@
 #!/usr/bin/env python3
-"""Serve the website locally using Python's HTTP server."""
+"""Serve the website locally using an in-process threaded HTTP server."""
 
 import argparse
+import email.utils
+import functools
+import http.client
 import os
-import subprocess
+import re
 import sys
+import threading
+import time
+from http import HTTPStatus
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
 from pathlib import Path
 
+# Files watched in --watch mode, relative to the project root
+_BIBTEX_FILE = Path("data") / "publications.bib"
+_WATCHED_FILES = (_BIBTEX_FILE, Path("index.html"), Path("styles.css"))
+
+# Server-sent events endpoint the injected script listens on for reload events
+_LIVE_RELOAD_PATH = "/__livereload"
+_LIVE_RELOAD_SCRIPT = (
+    "<script>"
+    f'new EventSource("{_LIVE_RELOAD_PATH}").onmessage = () => location.reload();'
+    "</script>\n"
+)
+
+# Seconds between keep-alive comments on idle live reload connections
+_LIVE_RELOAD_KEEPALIVE = 15
+
+# Single byte range, the only form of Range header that is honored
+_BYTE_RANGE_PATTERN = re.compile(r"bytes=(\d*)-(\d*)")
+
+# Pages and assets requested round-robin by --bench
+_BENCH_PATHS = (
+    "/",
+    "/styles.css",
+    "/data/cv_dschaub.pdf",
+    "/data/image.png",
+    "/data/startup.png",
+)
+
+
+class ReloadBroadcaster:
+    """Wake up every waiting live reload connection when the site changes"""
+
+    def __init__(self):
+        self._condition = threading.Condition()
+        self.version = 0
+
+    def notify(self):
+        with self._condition:
+            self.version += 1
+            self._condition.notify_all()
+
+    def wait(self, version, timeout):
+        """Block until the version moves past the given one or the timeout expires"""
+        with self._condition:
+            self._condition.wait_for(lambda: self.version != version, timeout)
+            return self.version
+
+
+def _parse_byte_range(header, size):
+    """
+    Parse a single "bytes=start-end" Range header.
+
+    Returns:
+        Inclusive (start, end) tuple, with start >= size if the range is
+        unsatisfiable, or None if the header should be ignored
+    """
+    match = _BYTE_RANGE_PATTERN.fullmatch(header.strip())
+    if not match or match.groups() == ("", ""):
+        return None
+
+    first, last = match.groups()
+    if not first:
+        # Suffix range: the last N bytes
+        return max(size - int(last), 0) if int(last) else size, size - 1
+
+    start = int(first)
+    end = min(int(last), size - 1) if last else size - 1
+    if last and int(last) < start:
+        return None
+    return start, end
+
+
+class StaticFileHandler(SimpleHTTPRequestHandler):
+    """
+    Static file handler for HTTP/1.1 keep-alive connections.
+
+    Supports ETag/Last-Modified validation with 304 responses, precompressed
+    ".gz" siblings for clients accepting gzip, single byte ranges and
+    zero-copy sendfile for file bodies.
+    """
+
+    protocol_version = "HTTP/1.1"
+    # Headers and the sendfile body are separate writes; without TCP_NODELAY
+    # Nagle's algorithm stalls every keep-alive response on a delayed ACK
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        self._serve_file(send_body=True)
+
+    def do_HEAD(self):
+        self._serve_file(send_body=False)
+
+    def _resolve_file(self):
+        """Map the request path to a file, or None to fall back to the default handler"""
+        path = self.translate_path(self.path)
+        if os.path.isdir(path):
+            # Redirects for missing trailing slashes and directory listings
+            # are left to SimpleHTTPRequestHandler
+            if not self.path.split("?", 1)[0].endswith("/"):
+                return None
+            for index in ("index.html", "index.htm"):
+                index_path = os.path.join(path, index)
+                if os.path.isfile(index_path):
+                    return index_path
+            return None
+        return path
+
+    def _serve_file(self, send_body):
+        path = self._resolve_file()
+        if path is None:
+            super().do_GET() if send_body else super().do_HEAD()
+            return
+        if not os.path.isfile(path):
+            self.send_error(HTTPStatus.NOT_FOUND, "File not found")
+            return
+
+        range_header = self.headers.get("Range")
+        gzip_path = path + ".gz"
+        has_gzip = os.path.isfile(gzip_path)
+        use_gzip = (
+            has_gzip
+            and not range_header
+            and "gzip" in self.headers.get("Accept-Encoding", "")
+            and os.path.getmtime(gzip_path) >= os.path.getmtime(path)
+        )
+
+        try:
+            f = open(gzip_path if use_gzip else path, "rb")
+        except OSError:
+            self.send_error(HTTPStatus.NOT_FOUND, "File not found")
+            return
+
+        try:
+            fs = os.fstat(f.fileno())
+            etag = f'"{fs.st_mtime_ns:x}-{fs.st_size:x}{"-gz" if use_gzip else ""}"'
+            last_modified = email.utils.formatdate(fs.st_mtime, usegmt=True)
+
+            if self._not_modified(etag, fs.st_mtime):
+                self.send_response(HTTPStatus.NOT_MODIFIED)
+                self._send_validators(etag, last_modified, has_gzip)
+                self.end_headers()
+                return
+
+            start, end = 0, fs.st_size - 1
+            byte_range = None
+            if range_header and self.headers.get("If-Range", etag) in (
+                etag,
+                last_modified,
+            ):
+                byte_range = _parse_byte_range(range_header, fs.st_size)
+            if byte_range is not None:
+                start, end = byte_range
+                if start >= fs.st_size:
+                    self.send_response(HTTPStatus.REQUESTED_RANGE_NOT_SATISFIABLE)
+                    self.send_header("Content-Range", f"bytes */{fs.st_size}")
+                    self.send_header("Content-Length", "0")
+                    self.end_headers()
+                    return
+                self.send_response(HTTPStatus.PARTIAL_CONTENT)
+                self.send_header("Content-Range", f"bytes {start}-{end}/{fs.st_size}")
+            else:
+                self.send_response(HTTPStatus.OK)
+
+            self.send_header("Content-Type", self.guess_type(path))
+            if use_gzip:
+                self.send_header("Content-Encoding", "gzip")
+            self.send_header("Content-Length", str(end - start + 1))
+            self.send_header("Accept-Ranges", "bytes")
+            self._send_validators(etag, last_modified, has_gzip)
+            self.end_headers()
+
+            if send_body and end >= start:
+                self.connection.sendfile(f, start, end - start + 1)
+        except (BrokenPipeError, ConnectionResetError):
+            self.close_connection = True
+        finally:
+            f.close()
+
+    def _not_modified(self, etag, mtime):
+        """Evaluate If-None-Match (preferred) or If-Modified-Since"""
+        if_none_match = self.headers.get("If-None-Match")
+        if if_none_match is not None:
+            tags = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+            return "*" in tags or etag in tags
+
+        if_modified_since = self.headers.get("If-Modified-Since")
+        if if_modified_since is not None:
+            try:
+                since = email.utils.parsedate_to_datetime(if_modified_since)
+            except (TypeError, ValueError):
+                return False
+            return int(mtime) <= since.timestamp()
+        return False
+
+    def _send_validators(self, etag, last_modified, has_gzip):
+        self.send_header("ETag", etag)
+        self.send_header("Last-Modified", last_modified)
+        # Always revalidate, so edits show up immediately while unchanged
+        # files cost a 304
+        self.send_header("Cache-Control", "no-cache")
+        if has_gzip:
+            self.send_header("Vary", "Accept-Encoding")
+
+
+class QuietStaticFileHandler(StaticFileHandler):
+    """Static file handler without per-request logging, used by --bench"""
+
+    def log_message(self, format, *args):
+        pass
+
+
+class LiveReloadHandler(StaticFileHandler):
+    """Static file handler that injects a live reload script into HTML pages"""
+
+    broadcaster = None
+
+    def do_GET(self):
+        if self.path == _LIVE_RELOAD_PATH:
+            self._stream_reload_events()
+            return
+
+        path = Path(self.translate_path(self.path))
+        if path.is_dir():
+            path = path / "index.html"
+        if path.suffix == ".html" and path.is_file():
+            self._send_html_with_reload_script(path)
+            return
+
+        super().do_GET()
+
+    def _send_html_with_reload_script(self, path):
+        content = path.read_text(encoding="utf-8")
+        index = content.rfind("</body>")
+        if index == -1:
+            index = len(content)
+        body = (content[:index] + _LIVE_RELOAD_SCRIPT + content[index:]).encode("utf-8")
+
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("Cache-Control", "no-store")
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _stream_reload_events(self):
+        # The stream has no length, so it ends by closing the connection
+        self.close_connection = True
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-store")
+        self.send_header("Connection", "close")
+        self.end_headers()
+
+        version = self.broadcaster.version
+        try:
+            while True:
+                new_version = self.broadcaster.wait(version, _LIVE_RELOAD_KEEPALIVE)
+                if new_version != version:
+                    version = new_version
+                    self.wfile.write(b"data: reload\n\n")
+                else:
+                    self.wfile.write(b": keep-alive\n\n")
+                self.wfile.flush()
+        except (BrokenPipeError, ConnectionResetError):
+            # The page was closed or reloaded
+            pass
+
+
+def _snapshot_mtimes(project_root):
+    """Map each watched file to its mtime (None if missing)"""
+    mtimes = {}
+    for relative_path in _WATCHED_FILES:
+        try:
+            mtimes[relative_path] = (project_root / relative_path).stat().st_mtime_ns
+        except FileNotFoundError:
+            mtimes[relative_path] = None
+    return mtimes
+
+
+def _make_rebuild(project_root, mode, selected_only):
+    """Return a function that rebuilds the publications section in-process"""
+    # Imported here so plain serving does not pay for loading pybtex
+    from scripts.bibtex_to_html import iter_publication_fragments, write_target_stream
+
+    bibtex_path = project_root / _BIBTEX_FILE
+    html_path = project_root / "index.html"
+    cache_dir = project_root / ".cache"
+    target = (mode, selected_only)
+
+    def rebuild():
+        start = time.perf_counter()
+        write_target_stream(
+            html_path,
+            iter_publication_fragments(bibtex_path, target, cache_dir),
+            inject_only=True,
+        )
+        print(f"Rebuilt publications in {(time.perf_counter() - start) * 1000:.0f} ms")
+
+    return rebuild
+
+
+def _watch(project_root, rebuild, broadcaster, interval):
+    """Poll watched files, rebuilding on BibTeX changes and pushing reload events"""
+    mtimes = _snapshot_mtimes(project_root)
+    while True:
+        time.sleep(interval)
+        current = _snapshot_mtimes(project_root)
+        changed = [path for path in _WATCHED_FILES if current[path] != mtimes[path]]
+        if not changed:
+            continue
+
+        print(f"Changed: {', '.join(str(path) for path in changed)}")
+        if _BIBTEX_FILE in changed:
+            try:
+                rebuild()
+            except SystemExit:
+                # write_target exits on write errors; keep watching
+                pass
+            # Pick up the index.html written by the rebuild so it does not
+            # trigger a second reload
+            current = _snapshot_mtimes(project_root)
+
+        mtimes = current
+        broadcaster.notify()
+
+
+def _make_server(project_root, port, handler, host=""):
+    """Create a threaded server for the project root"""
+    server = ThreadingHTTPServer(
+        (host, port), functools.partial(handler, directory=str(project_root))
+    )
+    server.daemon_threads = True
+    return server
+
+
+def _serve_forever(server, message):
+    """Serve until interrupted"""
+    print(message)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+def _serve_with_watch(project_root, port, mode, selected_only, interval):
+    """Serve in-process, rebuilding and live reloading the page on changes"""
+    rebuild = _make_rebuild(project_root, mode, selected_only)
+    # Initial build warms pybtex, the style and the caches for fast rebuilds
+    rebuild()
+
+    broadcaster = ReloadBroadcaster()
+    handler = type("Handler", (LiveReloadHandler,), {"broadcaster": broadcaster})
+    server = _make_server(project_root, port, handler)
+
+    watcher = threading.Thread(
+        target=_watch,
+        args=(project_root, rebuild, broadcaster, interval),
+        daemon=True,
+    )
+    watcher.start()
+
+    _serve_forever(
+        server, f"Serving {project_root} on http://localhost:{port}/ with live reload"
+    )
+
+
+def _bench_client(port, paths, count, latencies):
+    """Issue requests over one keep-alive connection, recording latencies"""
+    connection = http.client.HTTPConnection("127.0.0.1", port)
+    try:
+        for i in range(count):
+            start = time.perf_counter()
+            connection.request(
+                "GET", paths[i % len(paths)], headers={"Accept-Encoding": "gzip"}
+            )
+            response = connection.getresponse()
+            response.read()
+            latencies.append(time.perf_counter() - start)
+    finally:
+        connection.close()
+
+
+def _run_bench(project_root, requests, concurrency):
+    """Load the server from concurrent local clients and report throughput and latency"""
+    server = _make_server(project_root, 0, QuietStaticFileHandler, host="127.0.0.1")
+    server_thread = threading.Thread(target=server.serve_forever, daemon=True)
+    server_thread.start()
+    port = server.server_address[1]
+
+    paths = [
+        path
+        for path in _BENCH_PATHS
+        if path == "/" or (project_root / path[1:]).is_file()
+    ]
+    per_client = [requests // concurrency] * concurrency
+    for i in range(requests % concurrency):
+        per_client[i] += 1
+
+    latencies = []
+    clients = [
+        threading.Thread(target=_bench_client, args=(port, paths, count, latencies))
+        for count in per_client
+    ]
+    start = time.perf_counter()
+    for client in clients:
+        client.start()
+    for client in clients:
+        client.join()
+    elapsed = time.perf_counter() - start
+
+    server.shutdown()
+    server.server_close()
+
+    if not latencies:
+        print(
+            f"Error running benchmark: none of the {requests} requests completed",
+            file=sys.stderr,
+        )
+        sys.exit(1)
+
+    latencies.sort()
+    p50 = latencies[len(latencies) // 2] * 1000
+    p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))] * 1000
+    print(
+        f"{len(latencies)} requests over {concurrency} connections to {', '.join(paths)}"
+    )
+    print(f"Requests/sec: {len(latencies) / elapsed:.0f}")
+    print(f"Latency p50: {p50:.2f} ms, p99: {p99:.2f} ms")
+
 
 def main() -> None:
     """Run a local HTTP server to serve the website."""
@@ -19,19 +456,65 @@ def main() -> None:
         default=8000,
         help="Port to serve on (default: 8000)",
     )
+    parser.add_argument(
+        "--watch",
+        action="store_true",
+        help="Rebuild publications when data/publications.bib changes and "
+        "live reload the page when it, index.html or styles.css change",
+    )
+    parser.add_argument(
+        "--mode",
+        choices=["citation", "card"],
+        default="card",
+        help="Publication mode used for rebuilds in --watch mode (default: card)",
+    )
+    parser.add_argument(
+        "--all",
+        action="store_true",
+        help="Show all publications in --watch rebuilds (default: first-author only)",
+    )
+    parser.add_argument(
+        "--bench",
+        action="store_true",
+        help="Benchmark the server under concurrent local load instead of serving",
+    )
+    parser.add_argument(
+        "--bench-requests",
+        type=int,
+        default=2000,
+        help="Total requests issued by --bench (default: 2000)",
+    )
+    parser.add_argument(
+        "--bench-concurrency",
+        type=int,
+        default=16,
+        help="Concurrent keep-alive connections used by --bench (default: 16)",
+    )
+    parser.add_argument(
+        "--interval",
+        type=float,
+        default=0.1,
+        help="Seconds between file checks in --watch mode (default: 0.1)",
+    )
     args = parser.parse_args()
 
     # Get the project root (parent of scripts directory)
     script_dir = Path(__file__).parent
     project_root = script_dir.parent
 
-    # Change to the project root directory
-    os.chdir(project_root)
+    project_root = project_root.resolve()
 
-    # Call python -m http.server
-    sys.exit(
-        subprocess.run([sys.executable, "-m", "http.server", str(args.port)]).returncode
-    )
+    if args.bench:
+        _run_bench(project_root, args.bench_requests, max(1, args.bench_concurrency))
+    elif args.watch:
+        _serve_with_watch(
+            project_root, args.port, args.mode, not args.all, args.interval
+        )
+    else:
+        server = _make_server(project_root, args.port, StaticFileHandler)
+        _serve_forever(
+            server, f"Serving {project_root} on http://localhost:{args.port}/"
+        )
 
 
 if __name__ == "__main__":
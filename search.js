@@ -0,0 +1,116 @@
+// Client-side publication search over the prebuilt index written by
+// `bibtex-to-html --search-index PATH`. The index maps sorted terms to
+// delta-encoded lists of publication IDs (positions in the rendered list), so
+// nothing has to be tokenized or indexed in the browser.
+(function(global) {
+    'use strict';
+
+    const INDEX_VERSION = 1;
+
+    // Must match _search_tokens() in scripts/bibtex_to_html.py, which only
+    // indexes terms of at least two characters
+    function tokenize(text) {
+        return text
+            .normalize('NFKD')
+            .replace(/[\u0300-\u036f]/g, '')
+            .toLowerCase()
+            .split(/[^a-z0-9]+/)
+            .filter(token => token.length > 1);
+    }
+
+    // Index of the first term that is >= prefix
+    function lowerBound(terms, prefix) {
+        let low = 0;
+        let high = terms.length;
+        while (low < high) {
+            const middle = (low + high) >>> 1;
+            if (terms[middle] < prefix) {
+                low = middle + 1;
+            } else {
+                high = middle;
+            }
+        }
+        return low;
+    }
+
+    class PublicationIndex {
+        constructor(data) {
+            if (data.version !== INDEX_VERSION) {
+                throw new Error('Unsupported search index version ' + data.version);
+            }
+            this.count = data.count;
+            this.terms = data.terms;
+            this.postings = data.postings;
+            this.decoded = new Array(data.terms.length);
+        }
+
+        // Publication IDs of a term, decoded from gaps on first use
+        ids(termIndex) {
+            let ids = this.decoded[termIndex];
+            if (!ids) {
+                const gaps = this.postings[termIndex];
+                ids = new Uint32Array(gaps.length);
+                let id = 0;
+                for (let i = 0; i < gaps.length; i++) {
+                    id += gaps[i];
+                    ids[i] = id;
+                }
+                this.decoded[termIndex] = ids;
+            }
+            return ids;
+        }
+
+        // Returns a Uint8Array with 1 for every matching publication, or null
+        // for an empty query. Every query word must prefix-match some term.
+        search(query) {
+            const tokens = tokenize(query);
+            if (tokens.length === 0) {
+                return null;
+            }
+
+            let matches = null;
+            for (const token of tokens) {
+                const hits = new Uint8Array(this.count);
+                for (let i = lowerBound(this.terms, token);
+                    i < this.terms.length && this.terms[i].startsWith(token); i++) {
+                    const ids = this.ids(i);
+                    for (let j = 0; j < ids.length; j++) {
+                        hits[ids[j]] = 1;
+                    }
+                }
+                if (matches) {
+                    for (let id = 0; id < this.count; id++) {
+                        matches[id] &= hits[id];
+                    }
+                } else {
+                    matches = hits;
+                }
+            }
+            return matches;
+        }
+    }
+
+    function load(url) {
+        return fetch(url)
+            .then(response => response.ok ? response.json() : Promise.reject(new Error(response.statusText)))
+            .then(data => new PublicationIndex(data));
+    }
+
+    // Filter the publications in container as the user types into input
+    function attach(input, container, url) {
+        return load(url).then(index => {
+            function update() {
+                const matches = index.search(input.value);
+                const items = container.querySelectorAll('.publication-card, .publication');
+                items.forEach((item, id) => {
+                    item.hidden = matches !== null && !matches[id];
+                });
+            }
+            input.addEventListener('input', update);
+            update();
+            return index;
+        });
+    }
+
+    global.PublicationSearch = { load, attach, tokenize, PublicationIndex };
+})(window);